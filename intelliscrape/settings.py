@@ -46,6 +46,7 @@ INSTALLED_APPS = [
     'profile_finder.apps.ProfileFinderConfig',
 
     'widget_tweaks',
+    'django_celery_results',
 ]
 
 MIDDLEWARE = [
@@ -135,6 +136,9 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Compressed, content-addressed store for scraped page bodies
+SCRAPER_BLOB_ROOT = MEDIA_ROOT / 'blobs'
+
 # Google Custom Search API Configuration
 GOOGLE_API_KEY = os.getenv('GOOGLE_API_KEY')
 GOOGLE_CSE_ID = os.getenv('GOOGLE_CSE_ID')
@@ -142,6 +146,67 @@ GOOGLE_CSE_ID = os.getenv('GOOGLE_CSE_ID')
 # Remove old scraping-related settings
 # SEARCH_RATE_LIMIT and USER_AGENTS are no longer needed
 
+# Scraper crawl engine
+SCRAPER_GLOBAL_CONCURRENCY = 32  # in-flight fetches across all jobs in this process
+SCRAPER_RETRY_AFTER_DEFAULT = 30  # seconds a host is paused after a 429/503 without Retry-After
+SCRAPER_RETRY_AFTER_MAX = 600  # longest Retry-After pause honoured, in seconds
+SCRAPER_CHECKPOINT_INTERVAL = 5  # seconds between crawl progress checkpoints
+SCRAPER_SLOW_PHASE_SECONDS = 5  # fetch, parse or write steps slower than this are logged as slow_phase events
+SCRAPER_FETCH_RETRIES = 2  # immediate retries of a fetch that timed out or lost its connection
+SCRAPER_RETRY_BACKOFF = 1  # seconds; retries wait a random time up to this, doubling per retry
+SCRAPER_MAX_ATTEMPTS = 3  # fetches of a URL, across re-queues, before it is marked failed
+SCRAPER_BREAKER_THRESHOLD = 5  # consecutive failures that pause a host
+SCRAPER_BREAKER_COOLDOWN = 30  # seconds a failing host is paused; doubles while it keeps failing
+SCRAPER_BREAKER_MAX_COOLDOWN = 600
+SCRAPER_BREAKER_MAX_TRIPS = 5  # pauses without recovery before the job fails as host down (resumable)
+SCRAPER_RESPECT_ROBOTS = True  # skip robots.txt-disallowed URLs and honour its Crawl-delay
+SCRAPER_USE_SITEMAPS = True  # seed the frontier from the sitemaps robots.txt lists, or /sitemap.xml
+SCRAPER_SITEMAP_LIMIT = 50  # sitemap files read per job, nested sitemap indexes included
+SCRAPER_SITEMAP_MAX_BYTES = 50 * 1024 * 1024  # the sitemap protocol's own uncompressed size limit
+SCRAPER_MAX_PAGE_BYTES = 10 * 1024 * 1024  # larger bodies are abandoned mid-download and the page skipped
+# URLs ending in these are skipped without a request; set to () to decide by Content-Type alone
+SCRAPER_SKIP_EXTENSIONS = (
+    '.pdf', '.zip', '.gz', '.tar', '.rar', '.7z', '.exe', '.dmg', '.iso',
+    '.jpg', '.jpeg', '.png', '.gif', '.webp', '.svg', '.ico', '.bmp',
+    '.mp3', '.mp4', '.avi', '.mov', '.wav', '.webm',
+    '.doc', '.docx', '.xls', '.xlsx', '.ppt', '.pptx',
+    '.css', '.js', '.woff', '.woff2', '.ttf',
+)
+SCRAPER_PARSER_BACKEND = 'auto'  # link extraction: auto, selectolax, lxml, soup-anchors or soup
+# Parser processes shared by all jobs; 0 parses on each job's threads. Set to the
+# core count on dedicated crawler machines so parsing escapes the GIL.
+SCRAPER_PARSE_WORKERS = int(os.getenv('SCRAPER_PARSE_WORKERS', 0))
+SCRAPER_ENDPOINT_BATCH_SIZE = 500  # discovered endpoints buffered per bulk insert
+SCRAPER_BLOOM_CAPACITY = 1_000_000  # URLs per job before a Bloom seen-set's error rate degrades
+SCRAPER_BLOOM_ERROR_RATE = 0.01  # false positives cost one batched database check, never a missed URL
+SCRAPER_EXPORT_CACHE_ROOT = MEDIA_ROOT / 'exports'
+SCRAPER_EXPORT_CACHE_MAX_BYTES = 5 * 1024 ** 3  # least recently downloaded exports are evicted beyond this
+SCRAPER_EXPORT_CACHE_MAX_AGE = 30 * 24 * 3600  # seconds a cached export is kept
+# (format, dataset) exports built in the background once a job completes
+SCRAPER_EXPORT_PREBUILD = [
+    ('xlsx', None),
+    ('csv', 'endpoints'),
+    ('csv', 'profile-endpoints'),
+    ('csv', 'contents'),
+]
+SCRAPER_STALE_JOB_TIMEOUT = 300  # seconds without a checkpoint before a running job counts as dead
+
+# Background scraping jobs: 'thread' runs them in an in-process worker pool,
+# 'celery' hands them to Celery workers through CELERY_BROKER_URL
+SCRAPER_TASK_BACKEND = os.getenv('SCRAPER_TASK_BACKEND', 'thread')
+SCRAPER_WORKER_THREADS = 2  # concurrent jobs with the 'thread' backend
+
+CELERY_BROKER_URL = os.getenv('CELERY_BROKER_URL', 'redis://localhost:6379/0')
+CELERY_RESULT_BACKEND = 'django-db'
+CELERY_TASK_ACKS_LATE = True  # a job whose worker dies is redelivered and resumes
+CELERY_WORKER_PREFETCH_MULTIPLIER = 1
+
+# Shared HTTP client (scraper and Google search)
+HTTP_POOL_CONNECTIONS = 20  # hosts whose connection pools are kept
+HTTP_POOL_MAXSIZE = SCRAPER_GLOBAL_CONCURRENCY  # keep-alive connections per host
+HTTP_POOL_BLOCK = False  # past HTTP_POOL_MAXSIZE, open extra unpooled connections; True waits for a free one
+HTTP_DNS_CACHE_TTL = 300  # seconds resolved addresses are reused; 0 disables caching
+
 MINIMUM_CONFIDENCE_SCORE = 0.7  # threshold for accepting matches
 MAX_RETRIES = 3
 
@@ -178,5 +243,10 @@ LOGGING = {
             'level': 'DEBUG',
             'propagate': True,
         },
+        'scraper': {
+            'handlers': ['file', 'console'],
+            'level': 'INFO',
+            'propagate': True,
+        },
     },
 }
\ No newline at end of file
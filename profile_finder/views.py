@@ -9,8 +9,8 @@ from django.contrib import messages
 from django.core.exceptions import ValidationError
 from django.db import transaction
 from django.http import HttpResponseServerError
-import requests
 from requests.exceptions import RequestException
+from scraper.services.http_client import get_session
 from .models import Person, Profile, SearchHistory, Source
 from .forms import PersonSearchForm
 import json
@@ -159,7 +159,7 @@ def perform_google_search(query: str) -> List[Dict]:
     }
     
     try:
-        response = requests.get(base_url, params=params, timeout=10)
+        response = get_session().get(base_url, params=params, timeout=10)
         response.raise_for_status()
         data = response.json()
         
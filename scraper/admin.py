@@ -1,26 +1,42 @@
 from django.contrib import admin
-from .models import ScrapingJob, ScrapedContent, WebsiteEndpoint
+from .models import ScrapingJob, ScrapedContent, WebsiteEndpoint, FrontierURL, ProfilePattern
 
 @admin.register(ScrapingJob)
 class ScrapingJobAdmin(admin.ModelAdmin):
-    list_display = ('url', 'status', 'created_at', 'completed_at')
-    list_filter = ('status', 'created_at')
+    list_display = ('url', 'status', 'stop_reason', 'created_at', 'completed_at')
+    list_filter = ('status', 'stop_reason', 'created_at')
     search_fields = ('url', 'error_message')
     readonly_fields = ('created_at', 'completed_at')
     ordering = ('-created_at',)
 
 @admin.register(ScrapedContent)
 class ScrapedContentAdmin(admin.ModelAdmin):
-    list_display = ('url', 'job', 'scraped_at')
-    list_filter = ('scraped_at', 'job__status')
-    search_fields = ('url', 'html_content', 'job__url')
-    readonly_fields = ('scraped_at',)
+    list_display = ('url', 'title', 'job', 'content_size', 'change', 'scraped_at')
+    list_filter = ('scraped_at', 'change', 'job__status')
+    search_fields = ('url', 'title', 'html_preview', 'content_hash', 'job__url')
+    readonly_fields = ('scraped_at', 'content_hash', 'content_size')
     ordering = ('-scraped_at',)
 
 @admin.register(WebsiteEndpoint)
 class WebsiteEndpointAdmin(admin.ModelAdmin):
-    list_display = ('endpoint_name', 'url', 'path', 'job', 'discovered_at')
-    list_filter = ('discovered_at', 'job__status')
+    list_display = ('endpoint_name', 'url', 'path', 'profile_type', 'job', 'discovered_at')
+    list_filter = ('profile_type', 'discovered_at', 'job__status')
     search_fields = ('endpoint_name', 'url', 'path', 'job__url')
     readonly_fields = ('discovered_at',)
     ordering = ('-discovered_at',)
+
+@admin.register(FrontierURL)
+class FrontierURLAdmin(admin.ModelAdmin):
+    list_display = ('url', 'priority', 'depth', 'state', 'attempts', 'lastmod', 'job', 'discovered_at')
+    list_filter = ('state', 'job__status')
+    search_fields = ('url', 'job__url')
+    readonly_fields = ('discovered_at',)
+    ordering = ('job', '-priority', 'depth', 'id')
+
+@admin.register(ProfilePattern)
+class ProfilePatternAdmin(admin.ModelAdmin):
+    list_display = ('pattern', 'profile_type', 'site', 'position')
+    list_editable = ('position',)
+    list_filter = ('site',)
+    search_fields = ('pattern', 'profile_type', 'site')
+    ordering = ('site', 'position', 'id')
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class ScraperConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'scraper'
+
+    def ready(self):
+        # Registers the signal handlers
+        from . import signals  # noqa: F401
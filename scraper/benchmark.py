@@ -0,0 +1,250 @@
+"""Synthetic website and measurements used to benchmark the crawler against a local server."""
+import random
+import resource
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+# Site shapes worth tracking between commits; command-line options override any value
+SCENARIOS = {
+    'tree': {'pages': 500, 'fanout': 5},
+    'wide': {'pages': 2000, 'fanout': 50, 'depth': 2, 'cross_links': 20},
+    'slow': {'pages': 300, 'fanout': 5, 'slow_rate': 0.1, 'slow_latency': 1.0},
+    'errors': {'pages': 300, 'fanout': 5, 'error_rate': 0.1},
+    'traps': {'pages': 300, 'fanout': 5, 'trap_links': 3},
+}
+
+
+class SyntheticSite:
+    """Serves a tree of `pages` HTML pages where each page links to `fanout` children.
+
+    Everything that varies between pages is drawn from `seed`, so a given
+    configuration serves the same site on every run:
+
+    * `depth` caps how many levels the tree has
+    * `cross_links` adds links from each page to random other pages
+    * a `slow_rate` fraction of pages answer after `slow_latency` seconds
+    * an `error_rate` fraction of requests answer 500, like a flaky server
+    * `trap_links` links from each page into an endless /calendar/{n}/ chain
+    """
+
+    def __init__(self, pages=200, fanout=5, latency=0.05, page_size=2048, depth=None, cross_links=0,
+                 slow_rate=0.0, slow_latency=1.0, error_rate=0.0, trap_links=0, seed=0):
+        if depth is not None:
+            pages = min(pages, sum(fanout ** level for level in range(depth + 1)))
+        self.pages = pages
+        self.fanout = fanout
+        self.latency = latency
+        self.page_size = page_size
+        self.depth = depth
+        self.cross_links = cross_links
+        self.slow_latency = slow_latency
+        self.error_rate = error_rate
+        self.trap_links = trap_links
+        self.seed = seed
+        self.requests_served = 0
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+        rng = random.Random(seed)
+        # The home page is always fast, so every run starts the same way
+        others = range(1, pages)
+        self.slow_pages = set(rng.sample(others, int(len(others) * slow_rate)))
+        self._errors = random.Random(seed)
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def settings(self):
+        return {
+            'pages': self.pages,
+            'fanout': self.fanout,
+            'latency': self.latency,
+            'page_size': self.page_size,
+            'depth': self.depth,
+            'cross_links': self.cross_links,
+            'slow_pages': len(self.slow_pages),
+            'slow_latency': self.slow_latency,
+            'error_rate': self.error_rate,
+            'trap_links': self.trap_links,
+            'seed': self.seed,
+        }
+
+    def render_page(self, number):
+        first_child = number * self.fanout + 1
+        children = list(range(first_child, min(first_child + self.fanout, self.pages)))
+        if self.cross_links:
+            children += random.Random(f'{self.seed}-{number}').choices(range(self.pages), k=self.cross_links)
+        links = ''.join(f'<li><a href="/page/{child}/">Page {child}</a></li>' for child in children)
+        links += ''.join(
+            f'<li><a href="/calendar/{number * self.trap_links + offset}/">Events</a></li>'
+            for offset in range(self.trap_links)
+        )
+        return self._render(f'Page {number}', links)
+
+    def render_calendar(self, day):
+        return self._render(f'Calendar {day}', f'<a href="/calendar/{day + 1}/">Next day</a>')
+
+    def _render(self, title, links):
+        # Pad with ordinary nested markup so parsers do realistic work
+        block = '<div class="card"><h3>Section</h3><p>Lorem <b>ipsum</b> dolor <span>sit</span> amet.</p></div>'
+        filler = block * max(0, (self.page_size - len(links)) // len(block))
+        return (
+            f'<html><head><title>{title}</title></head><body>'
+            f'<nav><a href="/">Home</a></nav><ul>{links}</ul>{filler}'
+            f'</body></html>'
+        )
+
+    def _handler(self):
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            # Keep-alive, like a real web server
+            protocol_version = 'HTTP/1.1'
+            # Headers and body are written separately; don't let Nagle hold the body back
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                with site._lock:
+                    site.requests_served += 1
+                    failing = site.error_rate and site._errors.random() < site.error_rate
+
+                parts = self.path.strip('/').split('/')
+                try:
+                    number = int(parts[-1]) if self.path != '/' else 0
+                except ValueError:
+                    number = -1
+
+                if parts[0] == 'calendar' and number >= 0:
+                    body = site.render_calendar(number)
+                elif parts[0] in ('', 'page') and 0 <= number < site.pages:
+                    body = site.render_page(number)
+                else:
+                    body = None
+
+                latency = site.slow_latency if number in site.slow_pages and parts[0] == 'page' else site.latency
+                if latency:
+                    time.sleep(latency)
+
+                if body is None:
+                    self.send_error(404)
+                    return
+                if failing and parts[0] == 'page':
+                    self.send_error(500)
+                    return
+
+                body = body.encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+class QueryCounter:
+    """Counts SQL statements on every database connection, whichever thread opened it.
+
+    The crawler's ORM work runs on a separate DB thread with its own
+    connection, so Django's per-connection `queries` log would miss it.
+    Connections opened in other threads before the counter is entered
+    can't be reached, so enter it once, before any crawl runs.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self._lock = threading.Lock()
+        self._connections = []
+
+    def __call__(self, execute, sql, params, many, context):
+        with self._lock:
+            self.count += 1
+        return execute(sql, params, many, context)
+
+    def _install(self, connection, **kwargs):
+        if self not in connection.execute_wrappers:
+            connection.execute_wrappers.append(self)
+            self._connections.append(connection)
+
+    def __enter__(self):
+        for connection in connections.all(initialized_only=True):
+            self._install(connection)
+        connection_created.connect(self._install)
+        return self
+
+    def __exit__(self, *exc_info):
+        connection_created.disconnect(self._install)
+        for connection in self._connections:
+            if self in connection.execute_wrappers:
+                connection.execute_wrappers.remove(self)
+
+
+class PeakMemory:
+    """Samples the process's resident set size in the background and keeps the peak, in bytes.
+
+    Reads /proc on Linux. Elsewhere it falls back to the peak since the
+    process started, which earlier runs in the same process may have set.
+    """
+
+    def __init__(self, interval=0.02):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    @staticmethod
+    def current():
+        try:
+            with open('/proc/self/statm') as statm:
+                return int(statm.read().split()[1]) * resource.getpagesize()
+        except OSError:
+            return None
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, self.current() or 0)
+
+    def __enter__(self):
+        if self.current() is None:
+            return self
+        self.peak = self.current()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        if self._thread is None:
+            # No /proc, as on macOS, where ru_maxrss is in bytes
+            self.peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            return
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, self.current() or 0)
@@ -0,0 +1,42 @@
+import time
+from django.core.management.base import BaseCommand, CommandError
+from scraper.models import ScrapedContent
+from scraper.services.link_parsers import available_backends, get_link_parser
+
+class Command(BaseCommand):
+    help = 'Times each link-extraction backend over a corpus of stored pages'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--job', type=int, nargs='*', help='Only use pages from these jobs')
+        parser.add_argument('--limit', type=int, default=500, help='Maximum number of pages in the corpus')
+        parser.add_argument('--repeat', type=int, default=3, help='Runs per backend; the fastest is reported')
+
+    def handle(self, *args, **kwargs):
+        contents = ScrapedContent.objects.exclude(content_hash='').order_by('-scraped_at')
+        if kwargs['job']:
+            contents = contents.filter(job_id__in=kwargs['job'])
+        corpus = [content.html_content for content in contents[:kwargs['limit']]]
+        if not corpus:
+            raise CommandError('No stored pages to benchmark; run a scraping job first')
+
+        megabytes = sum(len(html.encode('utf-8')) for html in corpus) / 1024 / 1024
+        self.stdout.write(f"Corpus: {len(corpus)} pages, {megabytes:.1f} MB")
+
+        baseline = None
+        for name in available_backends():
+            link_parser = get_link_parser(name)
+            best = None
+            for _ in range(kwargs['repeat']):
+                started = time.perf_counter()
+                links = sum(len(link_parser.parse(html).links) for html in corpus)
+                elapsed = time.perf_counter() - started
+                best = elapsed if best is None else min(best, elapsed)
+
+            # The full-tree BeautifulSoup parser is what the crawler used originally
+            if name == 'soup':
+                baseline = best
+            speedup = f"{baseline / best:.1f}x" if baseline else '--'
+            self.stdout.write(
+                f"{name:<14} {len(corpus) / best:>9.1f} pages/sec {megabytes / best:>7.2f} MB/s "
+                f"links={links:<8} speedup={speedup}"
+            )
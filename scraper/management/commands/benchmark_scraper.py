@@ -0,0 +1,197 @@
+import json
+import shutil
+import subprocess
+import tempfile
+import time
+from contextlib import nullcontext
+from pathlib import Path
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+from scraper.benchmark import SCENARIOS, PeakMemory, QueryCounter, SyntheticSite
+from scraper.models import ScrapingJob
+from scraper.services.http_client import connection_stats
+from scraper.services.scraper_service import WebScraper
+from scraper.services.telemetry import performance_summary
+
+class Command(BaseCommand):
+    help = 'Crawls a local synthetic site and reports crawler throughput, memory and database queries'
+
+    # Measurements compared against a baseline, and whether a higher value is better
+    COMPARED = {'pages_per_second': True, 'queries_per_page': False, 'peak_rss_mb': False}
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scenario', choices=sorted(SCENARIOS), default='tree', help='Shape of the synthetic site')
+        parser.add_argument('--pages', type=int, help='Number of pages on the synthetic site')
+        parser.add_argument('--fanout', type=int, help='Links from each page to child pages')
+        parser.add_argument('--depth', type=int, help='Levels below the home page')
+        parser.add_argument('--cross-links', type=int, help='Extra links from each page to random pages')
+        parser.add_argument('--latency', type=float, default=0.05, help='Server response latency in seconds')
+        parser.add_argument('--page-size', type=int, default=2048, help='Approximate page size in bytes')
+        parser.add_argument('--slow-rate', type=float, help='Fraction of pages that respond slowly')
+        parser.add_argument('--slow-latency', type=float, help='Response latency of slow pages in seconds')
+        parser.add_argument('--error-rate', type=float, help='Fraction of requests that answer 500')
+        parser.add_argument('--trap-links', type=int, help='Links from each page into an endless calendar')
+        parser.add_argument('--seed', type=int, default=0, help='Seed for which pages are slow or cross-linked, and which requests fail')
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            nargs='+',
+            default=[1, 8, 32],
+            help='One benchmark run per in-flight fetch limit',
+        )
+        parser.add_argument('--repeat', type=int, default=3, help='Runs per concurrency; the fastest is reported')
+        parser.add_argument('--output', help='Write the results as JSON to this file')
+        parser.add_argument('--compare', help='JSON results of an earlier benchmark to compare against')
+        parser.add_argument(
+            '--tolerance',
+            type=float,
+            default=0.1,
+            help='Fractional slowdown or growth against --compare that counts as a regression',
+        )
+        parser.add_argument(
+            '--keep',
+            action='store_true',
+            help='Keep the benchmark jobs and their stored files',
+        )
+
+    def handle(self, *args, **kwargs):
+        site_options = dict(SCENARIOS[kwargs['scenario']])
+        for option in ('pages', 'fanout', 'depth', 'cross_links', 'latency', 'page_size',
+                       'slow_rate', 'slow_latency', 'error_rate', 'trap_links', 'seed'):
+            if kwargs[option] is not None:
+                site_options[option] = kwargs[option]
+        site = SyntheticSite(**site_options)
+
+        baseline = None
+        if kwargs['compare']:
+            try:
+                with open(kwargs['compare']) as baseline_file:
+                    baseline = json.load(baseline_file)
+            except (OSError, ValueError) as e:
+                raise CommandError(f"Cannot read {kwargs['compare']}: {e}")
+            if baseline.get('site') != site.settings():
+                self.stdout.write(self.style.WARNING('The baseline was measured on a different site; deltas are not comparable'))
+
+        results = {
+            'commit': self._commit(),
+            'scenario': kwargs['scenario'],
+            'site': site.settings(),
+            'runs': [],
+        }
+        # Page blobs go to a scratch directory unless the runs are kept
+        storage = nullcontext() if kwargs['keep'] else tempfile.TemporaryDirectory(prefix='benchmark_scraper_')
+        with storage as media_root, self._media_root(media_root), site, QueryCounter() as queries:
+            self.stdout.write(
+                f"Synthetic site at {site.base_url}: {site.pages} pages, "
+                f"fan-out {site.fanout}, {site.latency * 1000:.0f} ms latency, "
+                f"{len(site.slow_pages)} slow pages, {site.error_rate:.0%} errors, {site.trap_links} trap links per page"
+            )
+            for concurrency in kwargs['concurrency']:
+                runs = [self._run(site, concurrency, queries, kwargs['keep']) for _ in range(kwargs['repeat'])]
+                run = min(runs, key=lambda run: run['wall_time'])
+                results['runs'].append(run)
+                self._report(run)
+
+        if kwargs['output']:
+            with open(kwargs['output'], 'w') as output:
+                json.dump(results, output, indent=2)
+            self.stdout.write(f"Results written to {kwargs['output']}")
+
+        if baseline is not None:
+            self._compare(results, baseline, kwargs['tolerance'])
+
+    def _run(self, site, concurrency, queries, keep):
+        # No politeness limit against our own server, and every /page/{n} is wanted
+        job = ScrapingJob.objects.create(
+            url=site.base_url,
+            max_concurrency=concurrency,
+            host_rate=10000,
+            max_host_rate=10000,
+            # Enough for every /page/{n}; only the endless calendar runs into it
+            max_urls_per_template=site.pages if site.trap_links else None
+        )
+
+        scraper = WebScraper(job.id)
+        before = connection_stats()
+        queries_before = queries.count
+        with PeakMemory() as memory:
+            started = time.perf_counter()
+            scraper.start_scraping()
+            elapsed = time.perf_counter() - started
+        after = connection_stats()
+        query_count = queries.count - queries_before
+
+        job.refresh_from_db()
+        pages = job.contents.count()
+        run = {
+            'concurrency': concurrency,
+            'pages': pages,
+            'failed': job.pages_failed,
+            'urls_trapped': job.urls_trapped,
+            'wall_time': round(elapsed, 3),
+            'pages_per_second': round(pages / elapsed, 2),
+            'peak_rss_mb': round(memory.peak / 1024 / 1024, 1),
+            'queries': query_count,
+            'queries_per_page': round(query_count / pages, 2) if pages else 0,
+            'new_connections': after['new_connections'] - before['new_connections'],
+            'phase_seconds': {
+                name: phase['total_seconds']
+                for name, phase in performance_summary(job.telemetry)['phases'].items()
+            },
+        }
+
+        if not keep:
+            shutil.rmtree(scraper.storage_path, ignore_errors=True)
+            job.delete()
+        return run
+
+    @staticmethod
+    def _media_root(media_root):
+        if media_root is None:
+            return nullcontext()
+        return override_settings(MEDIA_ROOT=Path(media_root), SCRAPER_BLOB_ROOT=Path(media_root) / 'blobs')
+
+    def _report(self, run):
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"concurrency={run['concurrency']:<4} pages={run['pages']:<6} failed={run['failed']:<4} trapped={run['urls_trapped']:<5} "
+                f"time={run['wall_time']:.2f}s rate={run['pages_per_second']:.1f} pages/sec "
+                f"peak_rss={run['peak_rss_mb']:.0f}MB queries={run['queries']} ({run['queries_per_page']:.1f}/page) "
+                f"new_connections={run['new_connections']}"
+            )
+        )
+        self.stdout.write('    ' + '  '.join(
+            f"{name}={seconds:.2f}s" for name, seconds in run['phase_seconds'].items() if seconds
+        ))
+
+    def _compare(self, results, baseline, tolerance):
+        """Print each run's change against the baseline and fail if any measurement regressed"""
+        self.stdout.write(f"Compared with {baseline.get('commit') or 'baseline'}:")
+        previous_runs = {run['concurrency']: run for run in baseline.get('runs', [])}
+        regressions = []
+        for run in results['runs']:
+            previous = previous_runs.get(run['concurrency'])
+            if previous is None:
+                continue
+            deltas = []
+            for measure, higher_is_better in self.COMPARED.items():
+                if not previous.get(measure):
+                    continue
+                change = (run[measure] - previous[measure]) / previous[measure]
+                deltas.append(f"{measure} {previous[measure]} -> {run[measure]} ({change:+.0%})")
+                if (-change if higher_is_better else change) > tolerance:
+                    regressions.append(f"concurrency={run['concurrency']} {measure}")
+            self.stdout.write(f"  concurrency={run['concurrency']:<4} " + ', '.join(deltas))
+
+        if regressions:
+            raise CommandError(f"Regressed beyond {tolerance:.0%}: {', '.join(regressions)}")
+        self.stdout.write(self.style.SUCCESS('No regressions'))
+
+    def _commit(self):
+        """Commit the benchmark ran at, so saved results say what they measured"""
+        try:
+            return subprocess.run(
+                ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+from django.db.models import F
+from scraper.models import ScrapingJob
+from scraper.services.export_cache import export_cache
+from scraper.services.url_classifier import classifier_for, classify_endpoints, site_host
+
+class Command(BaseCommand):
+    help = "Re-classifies jobs' endpoints with the current profile patterns, after the patterns change"
+
+    def add_arguments(self, parser):
+        parser.add_argument('job_ids', nargs='*', type=int, help='Jobs to re-classify (default: every job)')
+        parser.add_argument('--site', help="Only jobs crawling this host, such as www.example.com")
+
+    def handle(self, *args, **kwargs):
+        jobs = ScrapingJob.objects.exclude(status='IN_PROGRESS').order_by('id')
+        if kwargs['job_ids']:
+            jobs = jobs.filter(id__in=kwargs['job_ids'])
+
+        classifiers = {}
+        for job in jobs:
+            host = site_host(job.url)
+            if kwargs['site'] and host != kwargs['site'].lower():
+                continue
+            if host not in classifiers:
+                classifiers[host] = classifier_for(job.url)
+
+            changed = classify_endpoints(job.endpoints.all(), classifiers[host])
+            if changed:
+                # Cached exports list the old types
+                ScrapingJob.objects.filter(id=job.id).update(data_version=F('data_version') + 1)
+                export_cache.invalidate(job.id)
+            self.stdout.write(f'Job {job.id} ({job.url}): {changed} endpoints re-classified')
+
+        self.stdout.write(self.style.SUCCESS('Done'))
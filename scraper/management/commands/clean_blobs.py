@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from django.template.defaultfilters import filesizeformat
+from scraper.services.blob_cleanup import collect_garbage
+
+class Command(BaseCommand):
+    help = 'Deletes stored page bodies that no scraped page refers to'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--min-age', type=int, default=3600,
+            help='Seconds a blob must have existed before it can be deleted, so running crawls are not affected'
+        )
+        parser.add_argument('--dry-run', action='store_true', help='Only report what would be deleted')
+
+    def handle(self, *args, **kwargs):
+        removed, freed = collect_garbage(min_age=kwargs['min_age'], dry_run=kwargs['dry_run'])
+        verb = 'Would delete' if kwargs['dry_run'] else 'Deleted'
+        self.stdout.write(self.style.SUCCESS(f'{verb} {removed} unreferenced blobs ({filesizeformat(freed)})'))
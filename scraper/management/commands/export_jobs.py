@@ -0,0 +1,45 @@
+import sys
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+from scraper.services.job_export import FORMATS, MERGED_DATASETS, bulk_export_stream, select_jobs
+
+class Command(BaseCommand):
+    help = "Exports the endpoints of several jobs as one file, with one row per URL"
+
+    def add_arguments(self, parser):
+        parser.add_argument('job_ids', nargs='*', type=int, help='Jobs to export')
+        parser.add_argument('--since', type=self._date, help='Jobs created on or after this date (YYYY-MM-DD)')
+        parser.add_argument('--until', type=self._date, help='Jobs created on or before this date (YYYY-MM-DD)')
+        parser.add_argument('--status', help='Only jobs with this status, such as COMPLETED')
+        parser.add_argument('--dataset', choices=list(MERGED_DATASETS), default='profile-endpoints')
+        parser.add_argument('--format', choices=list(FORMATS), default='csv')
+        parser.add_argument('--output', required=True, help="File to write, or - for standard output")
+
+    @staticmethod
+    def _date(value):
+        date = parse_date(value)
+        if date is None:
+            raise ValueError(value)
+        return date
+
+    def handle(self, *args, **kwargs):
+        if not (kwargs['job_ids'] or kwargs['since'] or kwargs['until']):
+            raise CommandError('Give job ids, --since or --until')
+
+        jobs = select_jobs(kwargs['job_ids'], kwargs['since'], kwargs['until'], kwargs['status'])
+        try:
+            chunks, _, _ = bulk_export_stream(jobs, kwargs['dataset'], kwargs['format'])
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        if kwargs['output'] == '-':
+            for chunk in chunks:
+                sys.stdout.buffer.write(chunk)
+            return
+
+        written = 0
+        with open(kwargs['output'], 'wb') as output:
+            for chunk in chunks:
+                output.write(chunk)
+                written += len(chunk)
+        self.stdout.write(self.style.SUCCESS(f"Wrote {written} bytes for {jobs.count()} jobs to {kwargs['output']}"))
@@ -0,0 +1,32 @@
+from pathlib import Path
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from scraper.models import ScrapingJob
+from scraper.services.archive import archive_job
+
+class Command(BaseCommand):
+    help = "Writes a job's stored pages to a WARC file, for tools that read web archives"
+
+    def add_arguments(self, parser):
+        parser.add_argument('job_id', type=int)
+        parser.add_argument(
+            '--output',
+            help="File to write (default: pages.warc.gz in the job's storage directory)"
+        )
+
+    def handle(self, *args, **kwargs):
+        try:
+            job = ScrapingJob.objects.get(id=kwargs['job_id'])
+        except ScrapingJob.DoesNotExist:
+            raise CommandError(f"Job {kwargs['job_id']} does not exist")
+
+        if kwargs['output']:
+            output = Path(kwargs['output'])
+        elif job.storage_path:
+            output = Path(settings.MEDIA_ROOT) / job.storage_path / 'pages.warc.gz'
+        else:
+            raise CommandError(f'Job {job.id} has not been crawled; pass --output')
+        output.parent.mkdir(parents=True, exist_ok=True)
+
+        written = archive_job(job, output)
+        self.stdout.write(self.style.SUCCESS(f'Wrote {written} pages to {output}'))
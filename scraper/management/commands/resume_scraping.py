@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand
+from scraper.models import ScrapingJob
+from scraper.services.scraper_service import WebScraper
+
+class Command(BaseCommand):
+    help = 'Resumes interrupted scraping jobs from their last checkpoint'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'job_ids',
+            nargs='*',
+            type=int,
+            help='Jobs to resume (defaults to every failed or stale job)',
+        )
+
+    def handle(self, *args, **kwargs):
+        if kwargs['job_ids']:
+            jobs = ScrapingJob.objects.filter(id__in=kwargs['job_ids'])
+        else:
+            jobs = ScrapingJob.objects.filter(status__in=['IN_PROGRESS', 'FAILED'])
+
+        resumable = [job for job in jobs.order_by('created_at') if job.can_resume]
+        if not resumable:
+            self.stdout.write('No interrupted jobs to resume.')
+            return
+
+        for job in resumable:
+            if not job.claim_for_resume():
+                self.stdout.write(f'Job {job.id} was picked up elsewhere, skipping')
+                continue
+            self.stdout.write(f'Resuming job {job.id} ({job.url})...')
+            try:
+                WebScraper(job.id).resume_scraping()
+                job.refresh_from_db()
+                self.stdout.write(
+                    self.style.SUCCESS(
+                        f'Job {job.id} completed: {job.pages_scraped} pages scraped, {job.pages_failed} failed'
+                    )
+                )
+            except Exception as e:
+                self.stdout.write(
+                    self.style.ERROR(f'Error resuming job {job.id}: {str(e)}')
+                )
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.5 on 2026-10-18 07:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraper', '0005_remove_scrapingjob_excluded_patterns'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scrapingjob',
+            name='max_concurrency',
+            field=models.PositiveSmallIntegerField(default=8, help_text='Maximum number of in-flight fetches for this job'),
+        ),
+    ]
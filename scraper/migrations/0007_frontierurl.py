@@ -0,0 +1,35 @@
+# Generated by Django 5.1.5 on 2026-10-18 07:53
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraper', '0006_scrapingjob_max_concurrency'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scrapingjob',
+            name='max_depth',
+            field=models.PositiveIntegerField(blank=True, help_text='Maximum link depth to follow from the start URL (unlimited if empty)', null=True),
+        ),
+        migrations.CreateModel(
+            name='FrontierURL',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('url', models.URLField(max_length=500)),
+                ('depth', models.PositiveIntegerField(default=0)),
+                ('state', models.CharField(choices=[('PENDING', 'Pending'), ('IN_PROGRESS', 'In Progress'), ('DONE', 'Done'), ('SKIPPED', 'Skipped'), ('FAILED', 'Failed')], default='PENDING', max_length=20)),
+                ('discovered_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='frontier', to='scraper.scrapingjob')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['job', 'state', 'depth'], name='scraper_fro_job_id_be25d5_idx')],
+                'unique_together': {('job', 'url')},
+            },
+        ),
+    ]
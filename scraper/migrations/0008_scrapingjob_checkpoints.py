@@ -0,0 +1,33 @@
+# Generated by Django 5.1.5 on 2026-10-18 07:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraper', '0007_frontierurl'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scrapingjob',
+            name='last_checkpoint_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='scrapingjob',
+            name='pages_failed',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='scrapingjob',
+            name='pages_scraped',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='scrapingjob',
+            name='storage_path',
+            field=models.CharField(blank=True, help_text="Directory holding this job's files, relative to MEDIA_ROOT", max_length=255),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.5 on 2026-10-18 07:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraper', '0008_scrapingjob_checkpoints'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scrapingjob',
+            name='host_rate',
+            field=models.FloatField(default=1.0, help_text='Initial requests per second to each host; adapts to how the host responds'),
+        ),
+        migrations.AddField(
+            model_name='scrapingjob',
+            name='max_host_rate',
+            field=models.FloatField(default=8.0, help_text='Upper bound on requests per second to each host'),
+        ),
+    ]
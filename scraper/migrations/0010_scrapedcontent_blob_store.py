@@ -0,0 +1,81 @@
+import gzip
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+# The blob store's layout as of this migration, kept here so later changes to it can't break it
+def _blob_path(digest):
+    root = Path(getattr(settings, 'SCRAPER_BLOB_ROOT', Path(settings.MEDIA_ROOT) / 'blobs'))
+    return root / digest[:2] / digest[2:4] / f"{digest}.gz"
+
+
+def _put_blob(data):
+    digest = hashlib.sha256(data).hexdigest()
+    path = _blob_path(digest)
+    if not path.exists():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(gzip.compress(data, compresslevel=6, mtime=0))
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+    return digest, len(data)
+
+
+def _get_blob(digest):
+    with open(_blob_path(digest), 'rb') as f:
+        return gzip.decompress(f.read())
+
+
+def move_html_to_blob_store(apps, schema_editor):
+    ScrapedContent = apps.get_model('scraper', 'ScrapedContent')
+    for content in ScrapedContent.objects.only('id', 'html_content').iterator(chunk_size=200):
+        digest, size = _put_blob(content.html_content.encode('utf-8'))
+        ScrapedContent.objects.filter(id=content.id).update(
+            content_hash=digest,
+            content_size=size,
+            html_content=content.html_content[:1000]
+        )
+
+
+def restore_html_from_blob_store(apps, schema_editor):
+    ScrapedContent = apps.get_model('scraper', 'ScrapedContent')
+    for content in ScrapedContent.objects.exclude(content_hash='').only('id', 'content_hash').iterator(chunk_size=200):
+        ScrapedContent.objects.filter(id=content.id).update(
+            html_content=_get_blob(content.content_hash).decode('utf-8')
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraper', '0009_scrapingjob_host_rate'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scrapedcontent',
+            name='content_hash',
+            field=models.CharField(db_index=True, default='', help_text='sha256 of the page body in the blob store', max_length=64),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='scrapedcontent',
+            name='content_size',
+            field=models.PositiveIntegerField(default=0, help_text='Uncompressed body size in bytes'),
+        ),
+        migrations.RunPython(move_html_to_blob_store, restore_html_from_blob_store),
+        migrations.RenameField(
+            model_name='scrapedcontent',
+            old_name='html_content',
+            new_name='html_preview',
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.1.5 on 2026-10-18 08:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraper', '0010_scrapedcontent_blob_store'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scrapedcontent',
+            name='archive_length',
+            field=models.PositiveIntegerField(blank=True, help_text="Compressed length of the page's WARC record", null=True),
+        ),
+        migrations.AddField(
+            model_name='scrapedcontent',
+            name='archive_offset',
+            field=models.BigIntegerField(blank=True, help_text="Byte offset of the page's record in the job's WARC archive", null=True),
+        ),
+        migrations.AlterField(
+            model_name='scrapedcontent',
+            name='html_file_path',
+            field=models.CharField(help_text='Path to the WARC archive holding the page', max_length=255),
+        ),
+    ]
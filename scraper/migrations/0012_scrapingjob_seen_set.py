@@ -0,0 +1,18 @@
+# Generated by Django 5.1.5 on 2026-10-18 08:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraper', '0011_scrapedcontent_archive'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scrapingjob',
+            name='seen_set',
+            field=models.CharField(choices=[('MEMORY', 'In-memory set'), ('BLOOM', 'Bloom filter with database check')], default='MEMORY', help_text='How discovered URLs are de-duplicated; use a Bloom filter to bound memory on very large crawls', max_length=10),
+        ),
+    ]
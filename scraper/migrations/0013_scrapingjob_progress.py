@@ -0,0 +1,23 @@
+# Generated by Django 5.1.5 on 2026-10-18 08:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraper', '0012_scrapingjob_seen_set'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scrapingjob',
+            name='bytes_downloaded',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='scrapingjob',
+            name='pages_queued',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.5 on 2026-10-18 08:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraper', '0013_scrapingjob_progress'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scrapedcontent',
+            name='title',
+            field=models.CharField(blank=True, max_length=500),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.5 on 2026-10-18 08:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraper', '0014_scrapedcontent_title'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scrapedcontent',
+            name='encoding',
+            field=models.CharField(blank=True, help_text='Character encoding of the stored body', max_length=40),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.5 on 2026-10-18 08:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraper', '0015_scrapedcontent_encoding'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='frontierurl',
+            name='lastmod',
+            field=models.DateTimeField(blank=True, help_text="Last modification time listed in the site's sitemap", null=True),
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.1.5 on 2026-10-18 08:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraper', '0016_frontierurl_lastmod'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='frontierurl',
+            name='scraper_fro_job_id_be25d5_idx',
+        ),
+        migrations.AddField(
+            model_name='frontierurl',
+            name='priority',
+            field=models.IntegerField(default=0, help_text='Higher priorities are crawled first'),
+        ),
+        migrations.AddField(
+            model_name='scrapingjob',
+            name='max_bytes',
+            field=models.BigIntegerField(blank=True, help_text='Stop once this many bytes have been downloaded (unlimited if empty)', null=True),
+        ),
+        migrations.AddField(
+            model_name='scrapingjob',
+            name='max_duration',
+            field=models.PositiveIntegerField(blank=True, help_text='Stop this many seconds after the crawl first started (unlimited if empty)', null=True),
+        ),
+        migrations.AddField(
+            model_name='scrapingjob',
+            name='max_pages',
+            field=models.PositiveIntegerField(blank=True, help_text='Stop once this many pages have been scraped (unlimited if empty)', null=True),
+        ),
+        migrations.AddField(
+            model_name='scrapingjob',
+            name='started_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='scrapingjob',
+            name='stop_reason',
+            field=models.CharField(blank=True, choices=[('pages', 'Page budget reached'), ('bytes', 'Byte budget reached'), ('time', 'Time budget reached')], help_text='Budget that ended the crawl before the frontier was exhausted', max_length=10),
+        ),
+        migrations.AddIndex(
+            model_name='frontierurl',
+            index=models.Index(fields=['job', 'state', '-priority', 'depth'], name='scraper_fro_job_id_ebfe72_idx'),
+        ),
+    ]
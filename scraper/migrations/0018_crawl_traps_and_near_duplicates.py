@@ -0,0 +1,39 @@
+# Generated by Django 5.1.5 on 2026-10-18 08:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraper', '0017_crawl_priority_and_budgets'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scrapedcontent',
+            name='duplicate_of',
+            field=models.ForeignKey(blank=True, help_text='Earlier page this one nearly duplicates; its links were not followed', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='near_duplicates', to='scraper.scrapedcontent'),
+        ),
+        migrations.AddField(
+            model_name='scrapedcontent',
+            name='simhash',
+            field=models.BigIntegerField(blank=True, help_text='SimHash fingerprint of the page', null=True),
+        ),
+        migrations.AddField(
+            model_name='scrapingjob',
+            name='max_urls_per_template',
+            field=models.PositiveIntegerField(blank=True, default=1000, help_text='URLs queued per path template such as /events/{n}?view, to stop crawl traps (unlimited if empty)', null=True),
+        ),
+        migrations.AddField(
+            model_name='scrapingjob',
+            name='pages_duplicate',
+            field=models.PositiveIntegerField(default=0, help_text='Near-duplicate pages whose links were not followed'),
+        ),
+        migrations.AddField(
+            model_name='scrapingjob',
+            name='urls_trapped',
+            field=models.PositiveIntegerField(default=0, help_text="Discovered URLs not queued because their path template's budget ran out"),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.5 on 2026-10-18 08:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraper', '0018_crawl_traps_and_near_duplicates'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='frontierurl',
+            name='attempts',
+            field=models.PositiveSmallIntegerField(default=0, help_text='Failed fetches so far'),
+        ),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 5.1.5 on 2026-10-18 08:29
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraper', '0019_frontierurl_attempts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scrapedcontent',
+            name='change',
+            field=models.CharField(blank=True, choices=[('ADDED', 'Added'), ('CHANGED', 'Changed'), ('UNCHANGED', 'Unchanged')], help_text="How the page differs from the previous job's copy, on incremental crawls", max_length=10),
+        ),
+        migrations.AddField(
+            model_name='scrapedcontent',
+            name='etag',
+            field=models.CharField(blank=True, help_text='ETag header, sent back as If-None-Match on re-crawls', max_length=255),
+        ),
+        migrations.AddField(
+            model_name='scrapedcontent',
+            name='last_modified',
+            field=models.CharField(blank=True, help_text='Last-Modified header, sent back as If-Modified-Since on re-crawls', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='scrapingjob',
+            name='pages_added',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='scrapingjob',
+            name='pages_changed',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='scrapingjob',
+            name='pages_removed',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='scrapingjob',
+            name='pages_unchanged',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='scrapingjob',
+            name='previous_job',
+            field=models.ForeignKey(blank=True, help_text='Earlier crawl of the same site; pages unchanged since then are not downloaded or stored again', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='next_jobs', to='scraper.scrapingjob'),
+        ),
+        migrations.AddIndex(
+            model_name='scrapedcontent',
+            index=models.Index(fields=['job', 'url'], name='scraper_scr_job_id_bbbe28_idx'),
+        ),
+    ]
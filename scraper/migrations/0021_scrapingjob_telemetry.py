@@ -0,0 +1,18 @@
+# Generated by Django 5.1.5 on 2026-10-18 08:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraper', '0020_incremental_recrawl'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scrapingjob',
+            name='telemetry',
+            field=models.JSONField(blank=True, default=dict, help_text='Phase timings, status codes and per-host statistics saved with each checkpoint'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.5 on 2026-10-18 08:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraper', '0021_scrapingjob_telemetry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scrapingjob',
+            name='data_version',
+            field=models.PositiveIntegerField(default=0, help_text='Raised whenever a crawl writes to the job, so cached exports of older data are not served'),
+        ),
+    ]
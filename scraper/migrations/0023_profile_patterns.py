@@ -0,0 +1,78 @@
+# Generated by Django 5.1.5 on 2026-10-18 08:54
+
+import re
+
+from django.db import migrations, models
+
+# The patterns ExcelExporter used to hard-code, typed by the pattern without its anchors
+DEFAULT_PATTERNS = [
+    r'^/masterclass-profile/',
+    r'^/speaker-profile/',
+    r'^/adviser-profile/',
+    r'^/masterclasses/',
+    r'^/conferenciers/',
+    r'^/orador/',
+    r'^/speakers?/',
+    r'^/profiles?/',
+    r'^/experts?/',
+    r'^/consultants?/',
+    r'^/advisers?/',
+    r'^/trainers?/',
+    r'^/instructors?/',
+]
+
+
+def add_default_patterns(apps, schema_editor):
+    ProfilePattern = apps.get_model('scraper', 'ProfilePattern')
+    WebsiteEndpoint = apps.get_model('scraper', 'WebsiteEndpoint')
+    patterns = [(pattern, pattern.strip('^/').strip('/')) for pattern in DEFAULT_PATTERNS]
+    ProfilePattern.objects.bulk_create([
+        ProfilePattern(pattern=pattern, profile_type=profile_type, position=position)
+        for position, (pattern, profile_type) in enumerate(patterns)
+    ])
+
+    # Type existing endpoints as the crawler does: first match, with a trailing slash
+    compiled = [(re.compile(pattern, re.IGNORECASE), profile_type) for pattern, profile_type in patterns]
+    typed = {}
+    endpoints = WebsiteEndpoint.objects.values_list('id', 'path').iterator(chunk_size=1000)
+    for endpoint_id, path in endpoints:
+        path = path if path.endswith('/') else path + '/'
+        profile_type = next((name for regex, name in compiled if regex.match(path)), None)
+        if profile_type:
+            typed.setdefault(profile_type, []).append(endpoint_id)
+    for profile_type, ids in typed.items():
+        for start in range(0, len(ids), 1000):
+            WebsiteEndpoint.objects.filter(id__in=ids[start:start + 1000]).update(profile_type=profile_type)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraper', '0022_scrapingjob_data_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProfilePattern',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('site', models.CharField(blank=True, help_text='Host name the pattern applies to, such as www.example.com; blank for every site', max_length=255)),
+                ('pattern', models.CharField(help_text='Regular expression matched case-insensitively from the start of a URL path, such as ^/speakers?/', max_length=255)),
+                ('profile_type', models.CharField(max_length=100)),
+                ('position', models.IntegerField(default=0, help_text="Patterns are tried in this order, the site's own before those for every site; the first match wins")),
+            ],
+            options={
+                'ordering': ['site', 'position', 'id'],
+            },
+        ),
+        migrations.AddField(
+            model_name='websiteendpoint',
+            name='profile_type',
+            field=models.CharField(blank=True, help_text='Type of the first ProfilePattern the path matched; blank if it is not a profile', max_length=100),
+        ),
+        migrations.AddIndex(
+            model_name='websiteendpoint',
+            index=models.Index(fields=['job', 'profile_type'], name='scraper_web_job_id_d71590_idx'),
+        ),
+        migrations.RunPython(add_default_patterns, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.1.5 on 2026-10-18 09:24
+
+from pathlib import Path
+from django.conf import settings
+from django.db import migrations, models
+
+
+def drop_cached_content_exports(apps, schema_editor):
+    # Cached exports of the contents dataset still have the removed archive columns
+    root = Path(getattr(settings, 'SCRAPER_EXPORT_CACHE_ROOT', Path(settings.MEDIA_ROOT) / 'exports'))
+    for path in root.glob('job_*/contents.*'):
+        path.unlink(missing_ok=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraper', '0023_profile_patterns'),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_cached_content_exports, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='scrapedcontent',
+            name='archive_length',
+        ),
+        migrations.RemoveField(
+            model_name='scrapedcontent',
+            name='archive_offset',
+        ),
+        migrations.AlterField(
+            model_name='scrapedcontent',
+            name='html_file_path',
+            field=models.CharField(blank=True, help_text='File older crawls also wrote the page to; bodies are read from the blob store', max_length=255),
+        ),
+    ]
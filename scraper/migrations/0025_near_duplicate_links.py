@@ -0,0 +1,24 @@
+# Generated by Django 5.1.5 on 2026-10-18 09:27
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraper', '0024_scrapedcontent_blobs_only'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='scrapedcontent',
+            name='duplicate_of',
+            field=models.ForeignKey(blank=True, help_text='Earlier page this one nearly duplicates', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='near_duplicates', to='scraper.scrapedcontent'),
+        ),
+        migrations.AlterField(
+            model_name='scrapingjob',
+            name='pages_duplicate',
+            field=models.PositiveIntegerField(default=0, help_text='Pages nearly identical to one crawled earlier'),
+        ),
+    ]
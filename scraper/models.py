@@ -1,5 +1,10 @@
+import re
+from datetime import timedelta
+from django.conf import settings
+from django.core.exceptions import ValidationError
 from django.db import models
 from django.utils import timezone
+from django.utils.functional import cached_property
 
 class ScrapingJob(models.Model):
     url = models.URLField(max_length=500)
@@ -16,29 +21,279 @@ class ScrapingJob(models.Model):
     created_at = models.DateTimeField(default=timezone.now)
     completed_at = models.DateTimeField(null=True, blank=True)
     error_message = models.TextField(null=True, blank=True)
+    max_concurrency = models.PositiveSmallIntegerField(
+        default=8,
+        help_text="Maximum number of in-flight fetches for this job"
+    )
+    max_depth = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        help_text="Maximum link depth to follow from the start URL (unlimited if empty)"
+    )
+    host_rate = models.FloatField(
+        default=1.0,
+        help_text="Initial requests per second to each host; adapts to how the host responds"
+    )
+    max_host_rate = models.FloatField(
+        default=8.0,
+        help_text="Upper bound on requests per second to each host"
+    )
+    seen_set = models.CharField(
+        max_length=10,
+        choices=[
+            ('MEMORY', 'In-memory set'),
+            ('BLOOM', 'Bloom filter with database check')
+        ],
+        default='MEMORY',
+        help_text="How discovered URLs are de-duplicated; use a Bloom filter to bound memory on very large crawls"
+    )
+    storage_path = models.CharField(
+        max_length=255,
+        blank=True,
+        help_text="Directory holding this job's files, relative to MEDIA_ROOT"
+    )
+    max_pages = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        help_text="Stop once this many pages have been scraped (unlimited if empty)"
+    )
+    max_bytes = models.BigIntegerField(
+        null=True,
+        blank=True,
+        help_text="Stop once this many bytes have been downloaded (unlimited if empty)"
+    )
+    max_duration = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        help_text="Stop this many seconds after the crawl first started (unlimited if empty)"
+    )
+    max_urls_per_template = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        default=1000,
+        help_text="URLs queued per path template such as /events/{n}?view, to stop crawl traps (unlimited if empty)"
+    )
+    previous_job = models.ForeignKey(
+        'self',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='next_jobs',
+        help_text="Earlier crawl of the same site; pages unchanged since then are not downloaded or stored again"
+    )
+    started_at = models.DateTimeField(null=True, blank=True)
+    stop_reason = models.CharField(
+        max_length=10,
+        blank=True,
+        choices=[
+            ('pages', 'Page budget reached'),
+            ('bytes', 'Byte budget reached'),
+            ('time', 'Time budget reached')
+        ],
+        help_text="Budget that ended the crawl before the frontier was exhausted"
+    )
+    pages_scraped = models.PositiveIntegerField(default=0)
+    pages_queued = models.PositiveIntegerField(default=0)
+    pages_failed = models.PositiveIntegerField(default=0)
+    bytes_downloaded = models.BigIntegerField(default=0)
+    pages_duplicate = models.PositiveIntegerField(
+        default=0,
+        help_text="Pages nearly identical to one crawled earlier"
+    )
+    urls_trapped = models.PositiveIntegerField(
+        default=0,
+        help_text="Discovered URLs not queued because their path template's budget ran out"
+    )
+    # Incremental crawls only: pages compared with the previous job
+    pages_added = models.PositiveIntegerField(default=0)
+    pages_changed = models.PositiveIntegerField(default=0)
+    pages_unchanged = models.PositiveIntegerField(default=0)
+    pages_removed = models.PositiveIntegerField(default=0)
+    telemetry = models.JSONField(
+        default=dict,
+        blank=True,
+        help_text="Phase timings, status codes and per-host statistics saved with each checkpoint"
+    )
+    data_version = models.PositiveIntegerField(
+        default=0,
+        help_text="Raised whenever a crawl writes to the job, so cached exports of older data are not served"
+    )
+    last_checkpoint_at = models.DateTimeField(null=True, blank=True)
 
     def __str__(self):
         return f"{self.url} - {self.status}"
 
+    PROGRESS_FIELDS = [
+        'status', 'pages_scraped', 'pages_queued', 'pages_failed', 'bytes_downloaded',
+        'pages_duplicate', 'urls_trapped', 'pages_added', 'pages_changed', 'pages_unchanged', 'pages_removed',
+        'last_checkpoint_at', 'completed_at', 'error_message', 'stop_reason'
+    ]
+
+    @property
+    def is_stale(self):
+        """An in-progress job whose crawler has stopped checkpointing"""
+        if self.status != 'IN_PROGRESS':
+            return False
+        heartbeat = self.last_checkpoint_at or self.created_at
+        timeout = getattr(settings, 'SCRAPER_STALE_JOB_TIMEOUT', 300)
+        return timezone.now() - heartbeat > timedelta(seconds=timeout)
+
+    @property
+    def can_resume(self):
+        return self.status == 'FAILED' or self.is_stale
+
+    def claim_for_resume(self):
+        """Move an interrupted job back to PENDING; False if another resume or its own crawler got there first"""
+        if not self.can_resume:
+            return False
+        # A live crawler moves last_checkpoint_at on, and a second resume has already changed the status
+        claimed = ScrapingJob.objects.filter(
+            id=self.id, status=self.status, last_checkpoint_at=self.last_checkpoint_at
+        ).update(status='PENDING')
+        if claimed:
+            self.status = 'PENDING'
+        return bool(claimed)
+
 class ScrapedContent(models.Model):
+    PREVIEW_LENGTH = 1000
+
     job = models.ForeignKey(ScrapingJob, on_delete=models.CASCADE, related_name='contents')
-    html_content = models.TextField(help_text="Preview of the HTML content")
-    html_file_path = models.CharField(max_length=255, help_text="Path to the stored HTML file")
+    title = models.CharField(max_length=500, blank=True)
+    html_preview = models.TextField(help_text="Preview of the HTML content")
+    content_hash = models.CharField(
+        max_length=64,
+        db_index=True,
+        help_text="sha256 of the page body in the blob store"
+    )
+    content_size = models.PositiveIntegerField(default=0, help_text="Uncompressed body size in bytes")
+    encoding = models.CharField(max_length=40, blank=True, help_text="Character encoding of the stored body")
+    html_file_path = models.CharField(
+        max_length=255,
+        blank=True,
+        help_text="File older crawls also wrote the page to; bodies are read from the blob store"
+    )
+    simhash = models.BigIntegerField(null=True, blank=True, help_text="SimHash fingerprint of the page")
+    etag = models.CharField(max_length=255, blank=True, help_text="ETag header, sent back as If-None-Match on re-crawls")
+    last_modified = models.CharField(
+        max_length=64,
+        blank=True,
+        help_text="Last-Modified header, sent back as If-Modified-Since on re-crawls"
+    )
+    change = models.CharField(
+        max_length=10,
+        blank=True,
+        choices=[
+            ('ADDED', 'Added'),
+            ('CHANGED', 'Changed'),
+            ('UNCHANGED', 'Unchanged')
+        ],
+        help_text="How the page differs from the previous job's copy, on incremental crawls"
+    )
+    duplicate_of = models.ForeignKey(
+        'self',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='near_duplicates',
+        help_text="Earlier page this one nearly duplicates"
+    )
     scraped_at = models.DateTimeField(default=timezone.now)
     url = models.URLField(max_length=500)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['job', 'url']),
+        ]
+
     def __str__(self):
         return f"Content from {self.url}"
 
+    @cached_property
+    def html_content(self):
+        """Full page body, loaded from the blob store on first access"""
+        from .services.blob_store import blob_store
+        return blob_store.get(self.content_hash).decode(self.encoding or 'utf-8', errors='replace')
+
 class WebsiteEndpoint(models.Model):
     job = models.ForeignKey(ScrapingJob, on_delete=models.CASCADE, related_name='endpoints')
     url = models.URLField(max_length=500)
     endpoint_name = models.CharField(max_length=255)
     path = models.CharField(max_length=500)
     discovered_at = models.DateTimeField(default=timezone.now)
+    profile_type = models.CharField(
+        max_length=100,
+        blank=True,
+        help_text="Type of the first ProfilePattern the path matched; blank if it is not a profile"
+    )
+
+    class Meta:
+        unique_together = ['job', 'url']
+        indexes = [
+            models.Index(fields=['job', 'profile_type']),
+        ]
+
+    def __str__(self):
+        return f"{self.endpoint_name} ({self.url})"
+
+class ProfilePattern(models.Model):
+    site = models.CharField(
+        max_length=255,
+        blank=True,
+        help_text="Host name the pattern applies to, such as www.example.com; blank for every site"
+    )
+    pattern = models.CharField(
+        max_length=255,
+        help_text="Regular expression matched case-insensitively from the start of a URL path, such as ^/speakers?/"
+    )
+    profile_type = models.CharField(max_length=100)
+    position = models.IntegerField(
+        default=0,
+        help_text="Patterns are tried in this order, the site's own before those for every site; the first match wins"
+    )
+
+    class Meta:
+        ordering = ['site', 'position', 'id']
+
+    def __str__(self):
+        return f"{self.pattern} ({self.profile_type})"
+
+    def clean(self):
+        self.site = self.site.strip().lower()
+        try:
+            compiled = re.compile(f'(?:{self.pattern})')
+        except re.error as e:
+            raise ValidationError({'pattern': f'Invalid regular expression: {e}'})
+        if compiled.groupindex:
+            # Each pattern becomes a named group of the combined expression
+            raise ValidationError({'pattern': 'Use (?:...) instead of named groups'})
+
+class FrontierURL(models.Model):
+    STATE_CHOICES = [
+        ('PENDING', 'Pending'),
+        ('IN_PROGRESS', 'In Progress'),
+        ('DONE', 'Done'),
+        ('SKIPPED', 'Skipped'),
+        ('FAILED', 'Failed')
+    ]
+
+    job = models.ForeignKey(ScrapingJob, on_delete=models.CASCADE, related_name='frontier')
+    url = models.URLField(max_length=500)
+    depth = models.PositiveIntegerField(default=0)
+    state = models.CharField(max_length=20, choices=STATE_CHOICES, default='PENDING')
+    priority = models.IntegerField(default=0, help_text="Higher priorities are crawled first")
+    attempts = models.PositiveSmallIntegerField(default=0, help_text="Failed fetches so far")
+    discovered_at = models.DateTimeField(default=timezone.now)
+    lastmod = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="Last modification time listed in the site's sitemap"
+    )
 
     class Meta:
         unique_together = ['job', 'url']
+        indexes = [
+            models.Index(fields=['job', 'state', '-priority', 'depth']),
+        ]
 
     def __str__(self):
-        return f"{self.endpoint_name} ({self.url})"
\ No newline at end of file
+        return f"{self.url} ({self.state}, depth {self.depth})"
@@ -0,0 +1,93 @@
+import gzip
+import hashlib
+import threading
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from .blob_store import blob_store
+
+WARC_VERSION = 'WARC/1.0'
+
+class JobArchive:
+    """Append-only WARC file of a job's pages, built from the blob store on request.
+
+    Each record is compressed as its own gzip member (the usual .warc.gz
+    layout), so any page can be read back by seeking to its offset and
+    decompressing `length` bytes, while the whole job stays one file that is
+    written sequentially and is cheap to copy or back up.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def _record(self, headers, block):
+        lines = [WARC_VERSION] + [f"{name}: {value}" for name, value in headers]
+        lines.append(f"Content-Length: {len(block)}")
+        head = ('\r\n'.join(lines) + '\r\n\r\n').encode('utf-8')
+        return gzip.compress(head + block + b'\r\n\r\n', compresslevel=6, mtime=0)
+
+    def _base_headers(self, record_type, date=None):
+        date = date or datetime.now(timezone.utc)
+        return [
+            ('WARC-Type', record_type),
+            ('WARC-Record-ID', f"<urn:uuid:{uuid.uuid4()}>"),
+            ('WARC-Date', date.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')),
+        ]
+
+    def append(self, url, body, content_type='text/html', date=None):
+        """Append a page fetched at `date` and return the (offset, length) of its compressed record"""
+        headers = self._base_headers('resource', date) + [
+            ('WARC-Target-URI', url),
+            ('WARC-Block-Digest', f"sha256:{hashlib.sha256(body).hexdigest()}"),
+            ('Content-Type', content_type),
+        ]
+        record = self._record(headers, body)
+
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, 'ab') as f:
+                offset = f.tell()
+                if offset == 0:
+                    info = b'software: IntelliScrape AI\r\nformat: WARC File Format 1.0\r\n'
+                    f.write(self._record(self._base_headers('warcinfo') + [
+                        ('Content-Type', 'application/warc-fields'),
+                    ], info))
+                    offset = f.tell()
+                f.write(record)
+        return offset, len(record)
+
+    def read(self, offset, length):
+        """Return the WARC headers and body of the record at `offset`"""
+        with open(self.path, 'rb') as f:
+            f.seek(offset)
+            record = gzip.decompress(f.read(length))
+
+        head, _, block = record.partition(b'\r\n\r\n')
+        headers = {}
+        for line in head.decode('utf-8').split('\r\n')[1:]:
+            name, _, value = line.partition(':')
+            headers[name.strip()] = value.strip()
+        return headers, block[:int(headers['Content-Length'])]
+
+def archive_job(job, path, store=None):
+    """Write every page `job` stored to a new WARC file at `path` and return how many.
+
+    The blob store holds the bodies; the archive is only a copy in a format
+    other tools read, so it is written to a temporary file and moved into
+    place once complete.
+    """
+    store = store or blob_store
+    path = Path(path)
+    partial = path.with_name(path.name + '.partial')
+    partial.unlink(missing_ok=True)
+    archive = JobArchive(partial)
+    pages = job.contents.order_by('id').values_list('url', 'content_hash', 'encoding', 'scraped_at')
+    written = 0
+    for url, content_hash, encoding, scraped_at in pages.iterator(chunk_size=500):
+        content_type = f'text/html; charset={encoding}' if encoding else 'text/html'
+        archive.append(url, store.get(content_hash), content_type, scraped_at)
+        written += 1
+    if written:
+        partial.replace(path)
+    return written
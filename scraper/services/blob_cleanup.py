@@ -0,0 +1,58 @@
+"""Removal of page bodies no ScrapedContent row refers to any more.
+
+Blobs are shared between jobs, so a blob is only deleted once no row
+anywhere references its digest. Deleting a job removes the blobs only it
+used; `manage.py clean_blobs` sweeps the whole store for anything else
+left behind.
+"""
+import time
+from itertools import islice
+from ..models import ScrapedContent
+from .blob_store import blob_store
+
+# Digests checked per query
+BATCH_SIZE = 500
+
+def referenced(digests):
+    """The subset of `digests` still used by some page"""
+    found = set()
+    digests = list(digests)
+    for start in range(0, len(digests), BATCH_SIZE):
+        batch = digests[start:start + BATCH_SIZE]
+        found.update(ScrapedContent.objects.filter(content_hash__in=batch).values_list('content_hash', flat=True))
+    return found
+
+def delete_unreferenced(digests, store=None):
+    """Delete those of `digests` no page refers to and return how many went"""
+    store = store or blob_store
+    unused = set(digests) - referenced(digests)
+    for digest in unused:
+        store.delete(digest)
+    return len(unused)
+
+def collect_garbage(min_age=3600, dry_run=False, store=None):
+    """Delete unreferenced blobs older than `min_age` seconds; return (count, bytes).
+
+    A crawl writes a page's blob shortly before inserting its row, so
+    recent blobs are left alone.
+    """
+    store = store or blob_store
+    cutoff = time.time() - min_age
+    removed, freed = 0, 0
+    blobs = store.iter_blobs()
+    while batch := dict(islice(blobs, BATCH_SIZE)):
+        in_use = referenced(batch)
+        for digest, path in batch.items():
+            if digest in in_use:
+                continue
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            if stat.st_mtime > cutoff:
+                continue
+            if not dry_run:
+                path.unlink(missing_ok=True)
+            removed += 1
+            freed += stat.st_size
+    return removed, freed
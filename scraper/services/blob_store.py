@@ -0,0 +1,63 @@
+import gzip
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+from django.conf import settings
+
+class BlobStore:
+    """Content-addressed store for page bodies.
+
+    Each body is gzip-compressed and stored once under its sha256 digest, so
+    identical pages across jobs share a single file on disk.
+    """
+
+    def __init__(self, root=None):
+        self._root = root
+
+    @property
+    def root(self):
+        # Read from the settings on use, so overriding them moves the store too
+        return Path(self._root or getattr(settings, 'SCRAPER_BLOB_ROOT', Path(settings.MEDIA_ROOT) / 'blobs'))
+
+    def path_for(self, digest):
+        # Two levels of fan-out keep directories small
+        return self.root / digest[:2] / digest[2:4] / f"{digest}.gz"
+
+    @staticmethod
+    def digest(data):
+        return hashlib.sha256(data).hexdigest()
+
+    def put(self, data):
+        """Store bytes and return their (sha256 digest, uncompressed size)"""
+        digest = self.digest(data)
+        path = self.path_for(digest)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Write to a temp file first so readers never see a partial blob
+            fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(gzip.compress(data, compresslevel=6, mtime=0))
+                os.replace(tmp_path, path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        return digest, len(data)
+
+    def get(self, digest):
+        with open(self.path_for(digest), 'rb') as f:
+            return gzip.decompress(f.read())
+
+    def exists(self, digest):
+        return self.path_for(digest).exists()
+
+    def iter_blobs(self):
+        """Yield (digest, path) for every stored blob"""
+        for path in self.root.glob('*/*/*.gz'):
+            yield path.name[:-len('.gz')], path
+
+    def delete(self, digest):
+        self.path_for(digest).unlink(missing_ok=True)
+
+blob_store = BlobStore()
@@ -0,0 +1,96 @@
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+class HostUnavailable(Exception):
+    """Raised once a host has stayed down through every cooldown"""
+
+class HostCircuit:
+    def __init__(self):
+        self.failures = 0
+        self.trips = 0
+        self.open_until = None
+        self.cooldown = None
+        self.probing = False
+        # Set whenever the circuit changes state, waking requests parked behind a probe
+        self.changed = asyncio.Event()
+
+    def notify(self):
+        self.changed.set()
+        self.changed = asyncio.Event()
+
+class CircuitBreaker:
+    """Stops sending requests to a host that keeps failing.
+
+    After `threshold` consecutive failures the host's circuit opens and its
+    requests wait out a cooldown instead of each timing out in turn. Then a
+    single probe request goes through: success closes the circuit, failure
+    reopens it with the cooldown doubled, up to `max_cooldown`. A host whose
+    circuit opens `max_trips` times without recovering is treated as down.
+    """
+
+    def __init__(self, threshold=5, cooldown=30, max_cooldown=600, max_trips=5):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.max_trips = max_trips
+        self._circuits = {}
+
+    def _circuit(self, host):
+        if host not in self._circuits:
+            self._circuits[host] = HostCircuit()
+        return self._circuits[host]
+
+    async def wait(self, host):
+        """Wait until a request to the host is allowed; True if it is the probe.
+
+        A probe must end in record_success, record_failure or release, or
+        the host's other requests wait for it forever.
+        """
+        circuit = self._circuit(host)
+        while circuit.open_until is not None:
+            if circuit.trips >= self.max_trips:
+                raise HostUnavailable(f"{host} is still failing after {circuit.trips} pauses; resume the job once it is back")
+            remaining = circuit.open_until - time.monotonic()
+            if remaining > 0:
+                await asyncio.sleep(remaining)
+            elif not circuit.probing:
+                # Half-open: this request is the probe
+                circuit.probing = True
+                return True
+            else:
+                await circuit.changed.wait()
+        return False
+
+    def release(self, host):
+        """End a probe that told nothing about the host, so another request probes instead"""
+        circuit = self._circuit(host)
+        if circuit.probing:
+            circuit.probing = False
+            circuit.notify()
+
+    def record_success(self, host):
+        circuit = self._circuit(host)
+        if circuit.open_until is not None:
+            logger.info("Host %s recovered; circuit closed", host)
+        circuit.failures = 0
+        circuit.trips = 0
+        circuit.open_until = None
+        circuit.cooldown = None
+        circuit.probing = False
+        circuit.notify()
+
+    def record_failure(self, host):
+        circuit = self._circuit(host)
+        circuit.failures += 1
+        if circuit.probing or (circuit.open_until is None and circuit.failures >= self.threshold):
+            circuit.cooldown = min(self.max_cooldown, circuit.cooldown * 2 if circuit.cooldown else self.cooldown)
+            circuit.open_until = time.monotonic() + circuit.cooldown
+            circuit.probing = False
+            circuit.trips += 1
+            logger.warning(
+                "Host %s failed %d times in a row; pausing it for %.0f s", host, circuit.failures, circuit.cooldown
+            )
+            circuit.notify()
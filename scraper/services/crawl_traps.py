@@ -0,0 +1,50 @@
+"""Per-template URL budgets that stop calendars, facets and endless pagination.
+
+URLs are reduced to a template: digit runs in the path become `{n}` and
+the query keeps only its sorted parameter names, so /events/2024/05?view=day
+and /events/2031/11?view=week share /events/{n}/{n}?view. Each template
+may only be queued a limited number of times per job.
+"""
+import re
+from collections import Counter
+from urllib.parse import parse_qsl, urlsplit
+from .url_priority import is_profile_path
+
+DIGITS = re.compile(r'\d+')
+
+def url_template(url):
+    parts = urlsplit(url)
+    template = DIGITS.sub('{n}', parts.path or '/')
+    keys = sorted({key for key, _ in parse_qsl(parts.query, keep_blank_values=True)})
+    if keys:
+        template += '?' + '&'.join(keys)
+    return template
+
+class TemplateBudget:
+    """Admits at most `budget` URLs per template; profile pages without a query are exempt"""
+
+    def __init__(self, budget, classifier):
+        self.budget = budget
+        self.classifier = classifier
+        self.counts = Counter()
+
+    def load(self, urls):
+        """Count URLs already queued, when resuming a job"""
+        for url in urls:
+            self.counts[url_template(url)] += 1
+
+    def admit(self, urls):
+        """Return the URLs whose template still has budget left"""
+        if self.budget is None:
+            return urls
+        admitted = []
+        for url in urls:
+            parts = urlsplit(url)
+            if not parts.query and is_profile_path(parts.path or '/', self.classifier):
+                admitted.append(url)
+                continue
+            template = url_template(url)
+            if self.counts[template] < self.budget:
+                self.counts[template] += 1
+                admitted.append(url)
+        return admitted
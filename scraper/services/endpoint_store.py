@@ -0,0 +1,39 @@
+from django.db import transaction
+from ..models import WebsiteEndpoint
+
+class EndpointBatcher:
+    """Collects discovered endpoints and writes them in bulk.
+
+    Navigation menus repeat the same links on every page, so endpoints are
+    checked against the job's seen-set and only new ones are buffered, then
+    inserted `batch_size` at a time. Each is stored with its profile type
+    from `classifier`.
+    """
+
+    def __init__(self, job, seen, classifier, batch_size=500):
+        self.job = job
+        self.seen = seen
+        self.classifier = classifier
+        self.batch_size = batch_size
+        self._pending = []
+
+    def add(self, endpoints):
+        """Buffer endpoints (a url -> field values mapping) not yet known and return their URLs"""
+        new_urls = self.seen.filter_new(endpoints)
+        for url in new_urls:
+            fields = endpoints[url]
+            self._pending.append(WebsiteEndpoint(
+                job=self.job, url=url, profile_type=self.classifier.classify_path(fields['path']) or '', **fields
+            ))
+
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+        return new_urls
+
+    def flush(self):
+        if not self._pending:
+            return
+        with transaction.atomic():
+            WebsiteEndpoint.objects.bulk_create(self._pending, batch_size=self.batch_size, ignore_conflicts=True)
+        self._pending = []
+        self.seen.flushed()
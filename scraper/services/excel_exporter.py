@@ -1,128 +1,116 @@
+from itertools import chain, islice
+from tempfile import TemporaryFile
 from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import Font, PatternFill
+from openpyxl.utils import get_column_letter
 from ..models import ScrapingJob
-import io
-import re
 
 class ExcelExporter:
-    PROFILE_PATTERNS = [
-        r'^/masterclass-profile/',
-        r'^/speaker-profile/',
-        r'^/adviser-profile/',
-        r'^/masterclasses/',
-        r'^/conferenciers/',
-        r'^/orador/',
-        r'^/speakers?/',
-        r'^/profiles?/',
-        r'^/experts?/',
-        r'^/consultants?/',
-        r'^/advisers?/',
-        r'^/trainers?/',
-        r'^/instructors?/'
-    ]
+    """Writes a job's endpoints and scraped pages to an xlsx file.
+
+    The workbook is built in openpyxl's write-only mode from chunked
+    queries that fetch only the exported columns, so memory use doesn't
+    grow with the job. Write-only sheets need their column widths before
+    the first row, so widths are estimated from each sheet's first chunk.
+    """
+
+    CHUNK_SIZE = 2000
+    # Long URLs would otherwise make columns wider than the screen
+    MAX_COLUMN_WIDTH = 100
+
+    DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
 
     def __init__(self, job_id):
         self.job = ScrapingJob.objects.get(id=job_id)
-        self.wb = Workbook()
+        self.wb = Workbook(write_only=True)
 
     def _create_header_style(self):
         header_font = Font(bold=True, color="FFFFFF")
         header_fill = PatternFill(start_color="4F46E5", end_color="4F46E5", fill_type="solid")
         return header_font, header_fill
 
-    def _is_profile_path(self, path):
-        """Check if the path matches any of the profile patterns"""
-        return any(re.match(pattern, path, re.IGNORECASE) for pattern in self.PROFILE_PATTERNS)
+    def _write_sheet(self, title, headers, rows):
+        """Stream rows into a new sheet, sizing columns from the header and the first chunk"""
+        ws = self.wb.create_sheet(title)
+        rows = iter(rows)
+        first_chunk = list(islice(rows, self.CHUNK_SIZE))
 
-    def _add_profile_endpoints_sheet(self):
-        """Add a sheet specifically for profile and speaker-related endpoints"""
-        ws = self.wb.create_sheet("Profile Endpoints")
-        
-        # Add headers
-        header_font, header_fill = self._create_header_style()
-        headers = ["Endpoint Name", "URL", "Path", "Type", "Discovered At"]
         for col, header in enumerate(headers, 1):
-            cell = ws.cell(row=1, column=col, value=header)
-            cell.font = header_font
-            cell.fill = header_fill
-
-        # Filter and add profile-related endpoints
-        row = 2
-        for endpoint in self.job.endpoints.all():
-            if self._is_profile_path(endpoint.path):
-                # Determine the type based on the path
-                endpoint_type = next(
-                    (pattern.strip('^/').strip('/') for pattern in self.PROFILE_PATTERNS 
-                     if re.match(pattern, endpoint.path, re.IGNORECASE)),
-                    'other'
-                )
-                
-                ws.cell(row=row, column=1, value=endpoint.endpoint_name)
-                ws.cell(row=row, column=2, value=endpoint.url)
-                ws.cell(row=row, column=3, value=endpoint.path)
-                ws.cell(row=row, column=4, value=endpoint_type)
-                ws.cell(row=row, column=5, value=endpoint.discovered_at.strftime('%Y-%m-%d %H:%M:%S'))
-                row += 1
-
-        # Adjust column widths
-        for col in ws.columns:
-            max_length = max(len(str(cell.value)) for cell in col)
-            ws.column_dimensions[col[0].column_letter].width = max_length + 2
+            width = max([len(header)] + [len(str(row[col - 1])) for row in first_chunk])
+            ws.column_dimensions[get_column_letter(col)].width = min(width + 2, self.MAX_COLUMN_WIDTH)
 
-    def _add_endpoints_sheet(self):
-        ws = self.wb.active
-        ws.title = "Website Endpoints"
-        
-        # Add headers
         header_font, header_fill = self._create_header_style()
-        headers = ["Endpoint Name", "URL", "Path", "Discovered At"]
-        for col, header in enumerate(headers, 1):
-            cell = ws.cell(row=1, column=col, value=header)
+        header_cells = []
+        for header in headers:
+            cell = WriteOnlyCell(ws, value=header)
             cell.font = header_font
             cell.fill = header_fill
+            header_cells.append(cell)
+        ws.append(header_cells)
 
-        # Add data
-        for row, endpoint in enumerate(self.job.endpoints.all(), 2):
-            ws.cell(row=row, column=1, value=endpoint.endpoint_name)
-            ws.cell(row=row, column=2, value=endpoint.url)
-            ws.cell(row=row, column=3, value=endpoint.path)
-            ws.cell(row=row, column=4, value=endpoint.discovered_at.strftime('%Y-%m-%d %H:%M:%S'))
+        for row in chain(first_chunk, rows):
+            ws.append(row)
 
-        # Adjust column widths
-        for col in ws.columns:
-            max_length = max(len(str(cell.value)) for cell in col)
-            ws.column_dimensions[col[0].column_letter].width = max_length + 2
+    def _endpoint_rows(self):
+        endpoints = (
+            self.job.endpoints
+            .order_by('id')
+            .values_list('endpoint_name', 'url', 'path', 'discovered_at')
+        )
+        for name, url, path, discovered_at in endpoints.iterator(chunk_size=self.CHUNK_SIZE):
+            yield name, url, path, discovered_at.strftime(self.DATE_FORMAT)
 
-    def _add_contents_sheet(self):
-        ws = self.wb.create_sheet("Scraped Contents")
-        
-        # Add headers
-        header_font, header_fill = self._create_header_style()
-        headers = ["URL", "Scraped At", "File Path"]
-        for col, header in enumerate(headers, 1):
-            cell = ws.cell(row=1, column=col, value=header)
-            cell.font = header_font
-            cell.fill = header_fill
+    def _profile_endpoint_rows(self):
+        # Classified when crawled; a range over the (job, profile_type) index skips the rest
+        endpoints = (
+            self.job.endpoints
+            .filter(profile_type__gt='')
+            .order_by('id')
+            .values_list('endpoint_name', 'url', 'path', 'profile_type', 'discovered_at')
+        )
+        for name, url, path, profile_type, discovered_at in endpoints.iterator(chunk_size=self.CHUNK_SIZE):
+            yield name, url, path, profile_type, discovered_at.strftime(self.DATE_FORMAT)
+
+    def _content_rows(self):
+        # Only the columns exported; never the page bodies
+        contents = self.job.contents.order_by('id').values_list('url', 'scraped_at', 'html_file_path')
+        for url, scraped_at, file_path in contents.iterator(chunk_size=self.CHUNK_SIZE):
+            yield url, scraped_at.strftime(self.DATE_FORMAT), file_path
+
+    def _add_endpoints_sheet(self):
+        self._write_sheet(
+            "Website Endpoints",
+            ["Endpoint Name", "URL", "Path", "Discovered At"],
+            self._endpoint_rows()
+        )
+
+    def _add_profile_endpoints_sheet(self):
+        """Add a sheet specifically for profile and speaker-related endpoints"""
+        self._write_sheet(
+            "Profile Endpoints",
+            ["Endpoint Name", "URL", "Path", "Type", "Discovered At"],
+            self._profile_endpoint_rows()
+        )
 
-        # Add data
-        for row, content in enumerate(self.job.contents.all(), 2):
-            ws.cell(row=row, column=1, value=content.url)
-            ws.cell(row=row, column=2, value=content.scraped_at.strftime('%Y-%m-%d %H:%M:%S'))
-            ws.cell(row=row, column=3, value=content.html_file_path)
+    def _add_contents_sheet(self):
+        self._write_sheet(
+            "Scraped Contents",
+            ["URL", "Scraped At", "File Path"],
+            self._content_rows()
+        )
 
-        # Adjust column widths
-        for col in ws.columns:
-            max_length = max(len(str(cell.value)) for cell in col)
-            ws.column_dimensions[col[0].column_letter].width = max_length + 2
+    def export(self, output=None):
+        """Write the workbook to `output` and return it, open at the start.
 
-    def export(self):
+        Without an output, a temporary file is used. It is deleted once
+        closed; a FileResponse closes it after streaming it to the client.
+        """
         self._add_endpoints_sheet()
-        self._add_profile_endpoints_sheet()  # Add the new profile endpoints sheet
+        self._add_profile_endpoints_sheet()
         self._add_contents_sheet()
-        
-        # Save to buffer
-        buffer = io.BytesIO()
-        self.wb.save(buffer)
-        buffer.seek(0)
-        
-        return buffer
+
+        output = output or TemporaryFile()
+        self.wb.save(output)
+        output.seek(0)
+        return output
@@ -0,0 +1,148 @@
+"""Finished exports of completed jobs, kept on disk and served again as they are.
+
+Each file is keyed by job, artifact (the dataset and format) and the job's
+data version: <root>/job_<id>/<artifact>.v<version>. A crawl that writes
+to a job bumps its data version and deletes the job's directory, so a
+cached file can be served without asking the database whether it is
+current. Should a build race a new crawl, the highest version wins.
+
+Files older than SCRAPER_EXPORT_CACHE_MAX_AGE are removed, and the least
+recently served ones go first once the cache outgrows
+SCRAPER_EXPORT_CACHE_MAX_BYTES.
+"""
+import logging
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from django.conf import settings
+from ..models import ScrapingJob
+from .excel_exporter import ExcelExporter
+from .job_export import export_format, export_stream
+
+logger = logging.getLogger(__name__)
+
+WORKBOOK = 'workbook.xlsx'
+
+class ExportCache:
+    def __init__(self, root=None, max_bytes=None, max_age=None):
+        self._root = root
+        self.max_bytes = max_bytes or getattr(settings, 'SCRAPER_EXPORT_CACHE_MAX_BYTES', 5 * 1024 ** 3)
+        self.max_age = max_age or getattr(settings, 'SCRAPER_EXPORT_CACHE_MAX_AGE', 30 * 24 * 3600)
+
+    @property
+    def root(self):
+        # Read from the settings on use, so overriding them moves the cache too
+        return Path(self._root or getattr(settings, 'SCRAPER_EXPORT_CACHE_ROOT', Path(settings.MEDIA_ROOT) / 'exports'))
+
+    @staticmethod
+    def artifact(format_name, dataset_name=None):
+        """File name for an export; raises ValueError for an unknown dataset or format"""
+        if format_name == 'xlsx':
+            return WORKBOOK
+        _, fmt = export_format(dataset_name, format_name)
+        return f'{dataset_name}.{fmt.extension}'
+
+    def _job_dir(self, job_id):
+        return self.root / f'job_{job_id}'
+
+    def lookup(self, job_id, artifact):
+        """Path of the newest cached copy of an artifact, or None"""
+        newest, newest_version = None, -1
+        try:
+            candidates = list(self._job_dir(job_id).glob(f'{artifact}.v*'))
+        except OSError:
+            return None
+        for path in candidates:
+            version = path.name.rsplit('.v', 1)[1]
+            if version.isdigit() and int(version) > newest_version:
+                newest, newest_version = path, int(version)
+        if newest is not None:
+            try:
+                # Eviction removes the least recently served files first
+                os.utime(newest)
+            except FileNotFoundError:
+                return None
+        return newest
+
+    def invalidate(self, job_id):
+        shutil.rmtree(self._job_dir(job_id), ignore_errors=True)
+
+    def _temp_file(self, job_id):
+        job_dir = self._job_dir(job_id)
+        job_dir.mkdir(parents=True, exist_ok=True)
+        return tempfile.mkstemp(dir=job_dir, suffix='.tmp')
+
+    def _publish(self, tmp_path, job_id, version, artifact):
+        path = self._job_dir(job_id) / f'{artifact}.v{version}'
+        os.replace(tmp_path, path)
+        # A crawl may have started while this was written; its data would be stale
+        if not ScrapingJob.objects.filter(id=job_id, status='COMPLETED', data_version=version).exists():
+            path.unlink(missing_ok=True)
+            return None
+        self.evict()
+        return path
+
+    def store_stream(self, job, artifact, chunks):
+        """Pass export chunks through, keeping a copy that is cached once the last chunk is written.
+
+        An export abandoned part way, say by a client disconnecting, is not cached.
+        """
+        fd, tmp_path = self._temp_file(job.id)
+        published = False
+        try:
+            with os.fdopen(fd, 'wb') as output:
+                for chunk in chunks:
+                    output.write(chunk)
+                    yield chunk
+            published = self._publish(tmp_path, job.id, job.data_version, artifact) is not None
+        finally:
+            if not published:
+                Path(tmp_path).unlink(missing_ok=True)
+
+    def build_workbook(self, job):
+        """Write the job's xlsx workbook into the cache and return its path"""
+        fd, tmp_path = self._temp_file(job.id)
+        try:
+            with os.fdopen(fd, 'wb') as output:
+                ExcelExporter(job.id).export(output)
+            return self._publish(tmp_path, job.id, job.data_version, WORKBOOK)
+        finally:
+            Path(tmp_path).unlink(missing_ok=True)
+
+    def build(self, job, format_name, dataset_name=None):
+        """Cache one export of a completed job unless it already is"""
+        artifact = self.artifact(format_name, dataset_name)
+        if self.lookup(job.id, artifact) is not None:
+            return
+        if format_name == 'xlsx':
+            self.build_workbook(job)
+        else:
+            chunks, _, _ = export_stream(job, dataset_name, format_name)
+            for _ in self.store_stream(job, artifact, chunks):
+                pass
+
+    def evict(self):
+        """Drop files past the maximum age, then the least recently served until under the size cap"""
+        now = time.time()
+        files = []
+        for path in self.root.glob('job_*/*'):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            if now - stat.st_mtime > self.max_age:
+                path.unlink(missing_ok=True)
+            elif not path.name.endswith('.tmp'):
+                files.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            logger.info("Evicted cached export %s", path)
+
+export_cache = ExportCache()
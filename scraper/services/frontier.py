@@ -0,0 +1,87 @@
+from django.db import transaction
+from django.db.models import Count, F
+from ..models import FrontierURL, ScrapedContent
+from .url_canonical import canonicalize_url
+
+class CrawlFrontier:
+    """Database-backed queue of URLs to crawl for a single job.
+
+    Uniqueness on (job, url) doubles as the seen-set, so the crawler keeps no
+    per-URL state in memory however large the site is.
+    """
+
+    # Priority lost per failed attempt, so a failing URL doesn't starve the rest
+    RETRY_PENALTY = 10
+
+    def __init__(self, job):
+        self.job = job
+
+    def add(self, urls, depth, lastmod=None, priority=None):
+        """Queue URLs at the given depth, ignoring any already known to the job.
+
+        `lastmod` optionally maps URLs to the modification time their sitemap
+        lists, and `priority` to their crawl priority (see url_priority).
+        """
+        if self.job.max_depth is not None and depth > self.job.max_depth:
+            return
+        lastmod = lastmod or {}
+        priority = priority or {}
+        FrontierURL.objects.bulk_create(
+            [
+                FrontierURL(job=self.job, url=url, depth=depth, lastmod=lastmod.get(url), priority=priority.get(url, 0))
+                for url in urls
+            ],
+            ignore_conflicts=True
+        )
+
+    def claim(self, limit):
+        """Mark up to `limit` pending URLs as in progress, highest priority then shallowest first"""
+        with transaction.atomic():
+            entries = list(
+                FrontierURL.objects
+                .filter(job=self.job, state='PENDING')
+                .order_by('-priority', 'depth', 'id')
+                .values_list('id', 'url', 'depth', 'attempts')[:limit]
+            )
+            FrontierURL.objects.filter(id__in=[entry[0] for entry in entries]).update(state='IN_PROGRESS')
+        return entries
+
+    def mark(self, entry_id, state):
+        FrontierURL.objects.filter(id=entry_id).update(state=state)
+
+    def retry(self, entry_id):
+        """Queue a failed URL again behind its peers, counting the attempt"""
+        FrontierURL.objects.filter(id=entry_id).update(
+            state='PENDING',
+            attempts=F('attempts') + 1,
+            priority=F('priority') - self.RETRY_PENALTY
+        )
+
+    def release(self, entry_ids):
+        """Return claimed URLs that were never fetched to the queue"""
+        FrontierURL.objects.filter(id__in=entry_ids).update(state='PENDING')
+
+    def pending_count(self):
+        return FrontierURL.objects.filter(job=self.job, state='PENDING').count()
+
+    def counts(self):
+        """Number of frontier entries in each state"""
+        rows = FrontierURL.objects.filter(job=self.job).values('state').annotate(total=Count('id'))
+        return {row['state']: row['total'] for row in rows}
+
+    def recover(self):
+        """Return URLs that were in flight when a crawl stopped to the queue.
+
+        Pages whose content was already stored are marked done instead, so a
+        resumed crawl never fetches them again. Jobs crawled before the
+        frontier existed are rebuilt from their stored pages and endpoints.
+        """
+        stored_urls = ScrapedContent.objects.filter(job=self.job).values('url')
+        with transaction.atomic():
+            if not FrontierURL.objects.filter(job=self.job).exists():
+                self.add([canonicalize_url(self.job.url)], 0)
+                self.add(self.job.endpoints.values_list('url', flat=True), 1)
+
+            unfinished = FrontierURL.objects.filter(job=self.job).exclude(state='DONE')
+            unfinished.filter(url__in=stored_urls).update(state='DONE')
+            unfinished.filter(state='IN_PROGRESS').update(state='PENDING')
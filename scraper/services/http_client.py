@@ -0,0 +1,160 @@
+"""Shared HTTP client with pooled keep-alive connections and cached DNS lookups.
+
+Every subsystem that talks HTTP should go through `get_session()` so that
+connections to a host are reused across requests, jobs and threads instead
+of paying a fresh TCP and TLS handshake each time.
+"""
+import ipaddress
+import socket
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import ConnectTimeoutError
+from django.conf import settings
+
+class ConnectionStats:
+    """Process-wide counters showing how often pooled connections are reused"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = {'requests': 0, 'new_connections': 0, 'dns_lookups': 0, 'dns_cache_hits': 0}
+
+    def increment(self, name):
+        with self._lock:
+            self._counts[name] += 1
+
+    def snapshot(self):
+        with self._lock:
+            counts = dict(self._counts)
+        counts['reused_connections'] = max(0, counts['requests'] - counts['new_connections'])
+        counts['reuse_ratio'] = (
+            round(counts['reused_connections'] / counts['requests'], 3) if counts['requests'] else 0.0
+        )
+        return counts
+
+class DNSCache:
+    """Remembers resolved addresses for `ttl` seconds so new connections skip the lookup"""
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = {}
+
+    def resolve(self, host, port):
+        """Every address `host` resolves to, in the resolver's order of preference"""
+        if self.ttl <= 0 or _is_ip_address(host):
+            return [host]
+
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get((host, port))
+        if entry and entry[1] > now:
+            _stats.increment('dns_cache_hits')
+            return entry[0]
+
+        # Errors propagate so urllib3 reports them as usual
+        addresses = list(dict.fromkeys(
+            info[4][0] for info in socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+        ))
+        _stats.increment('dns_lookups')
+        with self._lock:
+            self._entries[(host, port)] = (addresses, now + self.ttl)
+        return addresses
+
+    def forget(self, host, port):
+        """Drop a host whose addresses all refused, so the next connection looks it up again"""
+        with self._lock:
+            self._entries.pop((host, port), None)
+
+def _is_ip_address(host):
+    try:
+        ipaddress.ip_address(host.strip('[]'))
+        return True
+    except ValueError:
+        return False
+
+_stats = ConnectionStats()
+_dns_cache = DNSCache(getattr(settings, 'HTTP_DNS_CACHE_TTL', 300))
+
+class _CachedDNSConnectionMixin:
+    def _new_conn(self):
+        # Only the socket target changes; Host header, SNI and certificate checks keep the hostname
+        _stats.increment('new_connections')
+        hostname = self._dns_host
+        addresses = _dns_cache.resolve(hostname, self.port)
+        try:
+            # Like socket.create_connection, fall through to the next address when one can't be reached
+            for address in addresses[:-1]:
+                self._dns_host = address
+                try:
+                    return super()._new_conn()
+                except ConnectTimeoutError:
+                    continue
+            self._dns_host = addresses[-1]
+            try:
+                return super()._new_conn()
+            except ConnectTimeoutError:
+                _dns_cache.forget(hostname, self.port)
+                raise
+        finally:
+            self._dns_host = hostname
+
+class CachedDNSHTTPConnection(_CachedDNSConnectionMixin, HTTPConnection):
+    pass
+
+class CachedDNSHTTPSConnection(_CachedDNSConnectionMixin, HTTPSConnection):
+    pass
+
+class _CountingPoolMixin:
+    def urlopen(self, *args, **kwargs):
+        _stats.increment('requests')
+        return super().urlopen(*args, **kwargs)
+
+class PooledHTTPConnectionPool(_CountingPoolMixin, HTTPConnectionPool):
+    ConnectionCls = CachedDNSHTTPConnection
+
+class PooledHTTPSConnectionPool(_CountingPoolMixin, HTTPSConnectionPool):
+    ConnectionCls = CachedDNSHTTPSConnection
+
+class PooledHTTPAdapter(HTTPAdapter):
+    """requests adapter whose per-host pools count requests and use the DNS cache"""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': PooledHTTPConnectionPool,
+            'https': PooledHTTPSConnectionPool,
+        }
+
+_session = None
+_session_lock = threading.Lock()
+
+def build_session():
+    """Create a session configured from the HTTP_POOL_* settings"""
+    session = requests.Session()
+    adapter = PooledHTTPAdapter(
+        # Number of hosts whose pools are kept around
+        pool_connections=getattr(settings, 'HTTP_POOL_CONNECTIONS', 20),
+        # Keep-alive connections kept open per host
+        pool_maxsize=getattr(settings, 'HTTP_POOL_MAXSIZE', 32),
+        # When True, wait for a free connection instead of opening throwaway ones past the per-host limit
+        pool_block=getattr(settings, 'HTTP_POOL_BLOCK', False),
+    )
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+def get_session():
+    """Return the process-wide pooled session"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = build_session()
+        return _session
+
+def connection_stats():
+    """Request, connection and DNS counters for this process"""
+    return _stats.snapshot()
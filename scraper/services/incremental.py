@@ -0,0 +1,43 @@
+"""Support for incremental re-crawls that build on a site's previous job.
+
+A re-crawl sends each page's stored ETag and Last-Modified back as
+conditional headers. Pages whose body hashes the same as last time reuse
+the earlier blob instead of being stored again, and sitemap pages whose
+lastmod predates the previous crawl are queued after everything else.
+"""
+from collections import namedtuple
+from urllib.parse import urlsplit
+from ..models import ScrapingJob
+from .url_canonical import canonicalize_url
+
+PreviousPage = namedtuple('PreviousPage', [
+    'etag', 'last_modified', 'content_hash', 'content_size', 'encoding', 'title', 'html_preview', 'scraped_at'
+])
+
+def find_previous_job(url, exclude=None):
+    """Most recent completed job that crawled the same start URL"""
+    canonical = canonicalize_url(url)
+    candidates = (
+        ScrapingJob.objects
+        .filter(status='COMPLETED', url__icontains=urlsplit(canonical).netloc)
+        .order_by('-completed_at')
+    )
+    if exclude is not None:
+        candidates = candidates.exclude(id=exclude)
+    for job in candidates.only('id', 'url').iterator():
+        if canonicalize_url(job.url) == canonical:
+            return job
+    return None
+
+def load_previous_pages(job):
+    """Map each URL the job stored to what a re-crawl needs to know about it"""
+    rows = job.contents.values_list('url', *PreviousPage._fields)
+    return {row[0]: PreviousPage(*row[1:]) for row in rows.iterator(chunk_size=2000)}
+
+def conditional_headers(previous):
+    headers = {}
+    if previous.etag:
+        headers['If-None-Match'] = previous.etag
+    if previous.last_modified:
+        headers['If-Modified-Since'] = previous.last_modified
+    return headers
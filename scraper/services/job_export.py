@@ -0,0 +1,246 @@
+"""Streamed exports of a job's data as gzipped CSV, gzipped JSON Lines or Parquet.
+
+Rows come from chunked `values_list` queries over just the exported
+columns. Each chunk is encoded, compressed and handed to the response
+before the next is fetched, so an export of any size starts downloading
+at once and holds only one chunk in memory.
+
+Parquet needs pyarrow (`pip install pyarrow`); pandas turns each chunk
+into one row group with the same column types.
+
+Bulk exports merge the endpoints of many jobs into one row per URL, with a
+single GROUP BY query over the selected jobs.
+"""
+import csv
+import io
+import json
+import zlib
+from collections import namedtuple
+from itertools import islice
+import pandas as pd
+from django.db.models import Count, Max, Min
+from ..models import ScrapingJob, WebsiteEndpoint
+
+try:
+    import pyarrow
+    import pyarrow.parquet as parquet
+except ImportError:
+    pyarrow = None
+
+CHUNK_SIZE = 5000
+
+# `columns` maps each column to its pandas dtype; `rows` yields tuples in that order for a job
+Dataset = namedtuple('Dataset', ['columns', 'rows'])
+ExportFormat = namedtuple('ExportFormat', ['extension', 'content_type', 'write'])
+
+def _endpoint_rows(job):
+    endpoints = job.endpoints.order_by('id').values_list('endpoint_name', 'url', 'path', 'discovered_at')
+    return endpoints.iterator(chunk_size=CHUNK_SIZE)
+
+def _profile_endpoint_rows(job):
+    endpoints = (
+        job.endpoints.filter(profile_type__gt='').order_by('id')
+        .values_list('endpoint_name', 'url', 'path', 'profile_type', 'discovered_at')
+    )
+    return endpoints.iterator(chunk_size=CHUNK_SIZE)
+
+def _content_rows(job):
+    # Everything about a stored page except its body
+    contents = job.contents.order_by('id').values_list(
+        'url', 'title', 'scraped_at', 'change', 'content_hash', 'content_size', 'encoding', 'html_file_path'
+    )
+    return contents.iterator(chunk_size=CHUNK_SIZE)
+
+TIMESTAMP = 'datetime64[ns, UTC]'
+
+DATASETS = {
+    'endpoints': Dataset(
+        {'endpoint_name': 'string', 'url': 'string', 'path': 'string', 'discovered_at': TIMESTAMP},
+        _endpoint_rows
+    ),
+    'profile-endpoints': Dataset(
+        {'endpoint_name': 'string', 'url': 'string', 'path': 'string', 'type': 'string', 'discovered_at': TIMESTAMP},
+        _profile_endpoint_rows
+    ),
+    'contents': Dataset(
+        {
+            'url': 'string', 'title': 'string', 'scraped_at': TIMESTAMP, 'change': 'string',
+            'content_hash': 'string', 'content_size': 'Int64', 'encoding': 'string',
+            'html_file_path': 'string'
+        },
+        _content_rows
+    ),
+}
+
+def _chunks(rows):
+    rows = iter(rows)
+    while chunk := list(islice(rows, CHUNK_SIZE)):
+        yield chunk
+
+def _gzip(blocks):
+    """Gzip a stream of byte blocks, yielding compressed output as it is produced"""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for block in blocks:
+        compressed = compressor.compress(block)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+def _csv_blocks(dataset, rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(dataset.columns)
+    for chunk in _chunks(rows):
+        writer.writerows(
+            [value.isoformat() if hasattr(value, 'isoformat') else value for value in row]
+            for row in chunk
+        )
+        yield buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate()
+    # Whatever is left: the header alone if there were no rows
+    yield buffer.getvalue().encode('utf-8')
+
+def _isoformat(value):
+    return value.isoformat()
+
+def _jsonl_blocks(dataset, rows):
+    columns = list(dataset.columns)
+    for chunk in _chunks(rows):
+        lines = (json.dumps(dict(zip(columns, row)), default=_isoformat) for row in chunk)
+        yield ('\n'.join(lines) + '\n').encode('utf-8')
+
+def write_csv(dataset, rows):
+    return _gzip(_csv_blocks(dataset, rows))
+
+def write_jsonl(dataset, rows):
+    return _gzip(_jsonl_blocks(dataset, rows))
+
+class _StreamSink:
+    """Write-only file that pyarrow writes into and the response drains between row groups"""
+
+    def __init__(self):
+        self.closed = False
+        self._blocks = []
+        self._position = 0
+
+    def write(self, data):
+        data = bytes(data)
+        self._blocks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        data = b''.join(self._blocks)
+        self._blocks = []
+        return data
+
+def write_parquet(dataset, rows):
+    def frame(chunk):
+        return pd.DataFrame.from_records(chunk, columns=list(dataset.columns)).astype(dataset.columns)
+
+    sink = _StreamSink()
+    schema = pyarrow.Schema.from_pandas(frame([]), preserve_index=False)
+    writer = parquet.ParquetWriter(sink, schema)
+    try:
+        for chunk in _chunks(rows):
+            writer.write_table(pyarrow.Table.from_pandas(frame(chunk), schema=schema, preserve_index=False))
+            yield sink.drain()
+    finally:
+        writer.close()
+    # The footer, written on close
+    yield sink.drain()
+
+FORMATS = {
+    'csv': ExportFormat('csv.gz', 'application/gzip', write_csv),
+    'jsonl': ExportFormat('jsonl.gz', 'application/gzip', write_jsonl),
+    'parquet': ExportFormat('parquet', 'application/vnd.apache.parquet', write_parquet),
+}
+
+def export_format(dataset_name, format_name):
+    """The (Dataset, ExportFormat) pair to export.
+
+    Raises ValueError for an unknown dataset or format, or Parquet without pyarrow.
+    """
+    if dataset_name not in DATASETS:
+        raise ValueError(f"Unknown dataset '{dataset_name}'; choose from {', '.join(DATASETS)}")
+    if format_name not in FORMATS:
+        raise ValueError(f"Unknown export format '{format_name}'; choose from xlsx, {', '.join(FORMATS)}")
+    if format_name == 'parquet' and pyarrow is None:
+        raise ValueError('Parquet exports need pyarrow: pip install pyarrow')
+    return DATASETS[dataset_name], FORMATS[format_name]
+
+def export_filename(job_id, dataset_name, format_name):
+    return f'scraping_job_{job_id}_{dataset_name}.{FORMATS[format_name].extension}'
+
+def export_stream(job, dataset_name, format_name):
+    """Return (chunks, filename, content type) for one dataset of a job.
+
+    Invalid arguments raise ValueError before any query runs.
+    """
+    dataset, fmt = export_format(dataset_name, format_name)
+    filename = export_filename(job.id, dataset_name, format_name)
+    return fmt.write(dataset, dataset.rows(job)), filename, fmt.content_type
+
+def _merged_endpoint_rows(jobs, profiles_only):
+    endpoints = WebsiteEndpoint.objects.filter(job__in=jobs)
+    if profiles_only:
+        endpoints = endpoints.filter(profile_type__gt='')
+    merged = (
+        endpoints.values('url')
+        .annotate(
+            name=Max('endpoint_name'), endpoint_path=Max('path'), endpoint_type=Max('profile_type'),
+            first_seen=Min('discovered_at'), last_seen=Max('discovered_at'),
+            job_count=Count('job', distinct=True), last_job=Max('job')
+        )
+        .order_by('url')
+        .values_list('name', 'url', 'endpoint_path', 'endpoint_type', 'first_seen', 'last_seen', 'job_count', 'last_job')
+    )
+    return merged.iterator(chunk_size=CHUNK_SIZE)
+
+MERGED_COLUMNS = {
+    'endpoint_name': 'string', 'url': 'string', 'path': 'string', 'type': 'string',
+    'first_discovered_at': TIMESTAMP, 'last_discovered_at': TIMESTAMP, 'jobs': 'Int64', 'last_job_id': 'Int64'
+}
+
+# One row per URL across the jobs, with when and in how many jobs it was found
+MERGED_DATASETS = {
+    'endpoints': Dataset(MERGED_COLUMNS, lambda jobs: _merged_endpoint_rows(jobs, profiles_only=False)),
+    'profile-endpoints': Dataset(MERGED_COLUMNS, lambda jobs: _merged_endpoint_rows(jobs, profiles_only=True)),
+}
+
+def select_jobs(job_ids=None, since=None, until=None, status=None):
+    """Jobs by id, and/or created between two dates (inclusive), optionally with one status"""
+    jobs = ScrapingJob.objects.all()
+    if job_ids:
+        jobs = jobs.filter(id__in=job_ids)
+    if since:
+        jobs = jobs.filter(created_at__date__gte=since)
+    if until:
+        jobs = jobs.filter(created_at__date__lte=until)
+    if status:
+        jobs = jobs.filter(status=status)
+    return jobs
+
+def bulk_export_stream(jobs, dataset_name, format_name):
+    """Return (chunks, file extension, content type) for the merged endpoints of `jobs`.
+
+    `jobs` is a ScrapingJob queryset; it runs as a subquery, not per job.
+    Invalid arguments raise ValueError before any query runs.
+    """
+    if dataset_name not in MERGED_DATASETS:
+        raise ValueError(f"Unknown dataset '{dataset_name}'; choose from {', '.join(MERGED_DATASETS)}")
+    if format_name not in FORMATS:
+        raise ValueError(f"Unknown export format '{format_name}'; choose from {', '.join(FORMATS)}")
+    _, fmt = export_format(dataset_name, format_name)
+    dataset = MERGED_DATASETS[dataset_name]
+    return fmt.write(dataset, dataset.rows(jobs.values('id'))), fmt.extension, fmt.content_type
@@ -0,0 +1,135 @@
+"""Interchangeable HTML parsers that pull anchor hrefs out of a page.
+
+The crawler only needs `<a href>` values and the title, so building a full
+BeautifulSoup tree with the pure-Python parser is wasted work on large pages.
+Each backend returns the same ParsedPage; pick one with SCRAPER_PARSER_BACKEND.
+"""
+from collections import namedtuple
+from bs4 import BeautifulSoup, SoupStrainer
+from django.core.exceptions import ImproperlyConfigured
+
+try:
+    from lxml import etree
+except ImportError:
+    etree = None
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
+
+# `links` holds the href of every anchor that has one, in document order
+ParsedPage = namedtuple('ParsedPage', ['title', 'links'])
+
+class LinkParser:
+    name = None
+
+    @classmethod
+    def is_available(cls):
+        return True
+
+    def parse(self, html):
+        """Return the page's ParsedPage"""
+        raise NotImplementedError
+
+def _soup_page(soup):
+    try:
+        title = soup.title.get_text() if soup.title else None
+        return ParsedPage(title, [anchor.get('href') for anchor in soup.find_all('a', href=True)])
+    finally:
+        # Break the tree's parent/child reference cycles so it is reclaimed now
+        soup.decompose()
+
+class SoupLinkParser(LinkParser):
+    """Full BeautifulSoup tree with the pure-Python parser (the original behaviour)"""
+    name = 'soup'
+
+    def parse(self, html):
+        return _soup_page(BeautifulSoup(html, 'html.parser'))
+
+class StrainedSoupLinkParser(LinkParser):
+    """BeautifulSoup that only builds anchor and title tags, skipping the rest of the tree"""
+    name = 'soup-anchors'
+
+    def parse(self, html):
+        return _soup_page(BeautifulSoup(html, 'html.parser', parse_only=SoupStrainer(['a', 'title'])))
+
+class _AnchorCollector:
+    """lxml parser target that records hrefs as tags stream past, building no tree"""
+
+    def __init__(self):
+        self.links = []
+        self.title = None
+        self._in_title = False
+
+    def start(self, tag, attrib):
+        if tag == 'a':
+            href = attrib.get('href')
+            if href is not None:
+                self.links.append(href)
+        elif tag == 'title' and self.title is None:
+            self._in_title = True
+            self.title = ''
+
+    def end(self, tag):
+        if tag == 'title':
+            self._in_title = False
+
+    def data(self, data):
+        if self._in_title:
+            self.title += data
+
+    def close(self):
+        return ParsedPage(self.title, self.links)
+
+class LxmlLinkParser(LinkParser):
+    """libxml2's C HTML parser in streaming mode; only anchors are kept"""
+    name = 'lxml'
+
+    @classmethod
+    def is_available(cls):
+        return etree is not None
+
+    def parse(self, html):
+        parser = etree.HTMLParser(target=_AnchorCollector())
+        parser.feed(html)
+        return parser.close()
+
+class SelectolaxLinkParser(LinkParser):
+    """Lexbor's C HTML parser through selectolax"""
+    name = 'selectolax'
+
+    @classmethod
+    def is_available(cls):
+        return LexborHTMLParser is not None
+
+    def parse(self, html):
+        tree = LexborHTMLParser(html)
+        title = tree.css_first('title')
+        return ParsedPage(
+            title.text() if title else None,
+            [node.attributes.get('href') for node in tree.css('a[href]')]
+        )
+
+PARSER_BACKENDS = {
+    parser.name: parser
+    for parser in (SoupLinkParser, StrainedSoupLinkParser, LxmlLinkParser, SelectolaxLinkParser)
+}
+
+# Fastest first; 'auto' picks the first one installed
+AUTO_ORDER = ['selectolax', 'lxml', 'soup-anchors']
+
+def available_backends():
+    return [name for name, parser in PARSER_BACKENDS.items() if parser.is_available()]
+
+def get_link_parser(name='auto'):
+    if name == 'auto':
+        name = next(name for name in AUTO_ORDER if PARSER_BACKENDS[name].is_available())
+    parser = PARSER_BACKENDS.get(name)
+    if parser is None:
+        raise ImproperlyConfigured(
+            f"Unknown parser backend '{name}'; choose one of: auto, {', '.join(PARSER_BACKENDS)}"
+        )
+    if not parser.is_available():
+        raise ImproperlyConfigured(f"Parser backend '{name}' is not installed")
+    return parser()
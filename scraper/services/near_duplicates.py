@@ -0,0 +1,82 @@
+"""SimHash fingerprints for spotting pages that are near copies of one already crawled.
+
+Session IDs, sort orders and print views serve the same page under many
+URLs. Their fingerprints differ in only a few bits. The crawler records
+such pages as duplicates but still follows their links, which the seen-set
+already reduces to the ones it hasn't met.
+"""
+import hashlib
+import heapq
+import re
+
+BITS = 64
+# Fingerprints this many bits apart or closer count as the same page
+MAX_DISTANCE = 3
+# Pigeonhole: pages within MAX_DISTANCE bits share at least one whole block
+BLOCKS = MAX_DISTANCE + 1
+BLOCK_BITS = BITS // BLOCKS
+# Features per kind (word shingles, links) that go into a fingerprint
+SAMPLE_SIZE = 128
+
+SKIPPED_ELEMENTS = re.compile(r'<(script|style)\b.*?</\1\s*>', re.IGNORECASE | re.DOTALL)
+TAGS = re.compile(r'<[^>]*>')
+WORDS = re.compile(r'\w+')
+
+def _hash(feature):
+    return int.from_bytes(hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest(), 'little')
+
+def _sample(features):
+    """Hashes of the SAMPLE_SIZE smallest-hashing distinct features.
+
+    A bottom-k sample keeps fingerprinting cost flat on long pages while
+    similar pages still pick mostly the same features.
+    """
+    return heapq.nsmallest(SAMPLE_SIZE, {_hash(feature) for feature in features})
+
+def simhash(html, links):
+    """Fingerprint a page from its visible words and its links.
+
+    Word shingles and links each carry half the weight. Template-heavy pages
+    that differ only in where they link are then not mistaken for copies.
+    """
+    words = WORDS.findall(TAGS.sub(' ', SKIPPED_ELEMENTS.sub(' ', html)).lower())
+    shingles = (' '.join(words[i:i + 3]) for i in range(max(1, len(words) - 2)))
+
+    weights = [0.0] * BITS
+    for hashes in (_sample(shingles) if words else [], _sample(links)):
+        weight = 1.0 / len(hashes) if hashes else 0
+        for value in hashes:
+            for bit in range(BITS):
+                weights[bit] += weight if value >> bit & 1 else -weight
+
+    fingerprint = 0
+    for bit in range(BITS):
+        if weights[bit] > 0:
+            fingerprint |= 1 << bit
+    # Stored in a signed 64-bit column
+    return fingerprint - (1 << BITS) if fingerprint >= 1 << (BITS - 1) else fingerprint
+
+class SimHashIndex:
+    """Fingerprints of a job's pages, bucketed by block for near-match lookups"""
+
+    def __init__(self):
+        self._buckets = {}
+
+    def _keys(self, fingerprint):
+        fingerprint &= (1 << BITS) - 1
+        mask = (1 << BLOCK_BITS) - 1
+        return [(block, fingerprint >> (block * BLOCK_BITS) & mask) for block in range(BLOCKS)]
+
+    def find(self, fingerprint):
+        """Id of an indexed page within MAX_DISTANCE bits of `fingerprint`, or None"""
+        unsigned = fingerprint & ((1 << BITS) - 1)
+        for key in self._keys(fingerprint):
+            for other, page_id in self._buckets.get(key, ()):
+                if bin(unsigned ^ other).count('1') <= MAX_DISTANCE:
+                    return page_id
+        return None
+
+    def add(self, fingerprint, page_id):
+        unsigned = fingerprint & ((1 << BITS) - 1)
+        for key in self._keys(fingerprint):
+            self._buckets.setdefault(key, []).append((unsigned, page_id))
@@ -0,0 +1,106 @@
+"""Turns a fetched page into the endpoints and metadata the crawler stores.
+
+Nothing here touches Django models or settings, so it runs unchanged in the
+crawler's threads or in separate parser processes (see parse_pool).
+"""
+import codecs
+import re
+from urllib.parse import urljoin, urlparse
+from .link_parsers import get_link_parser
+from .near_duplicates import simhash
+from .url_canonical import canonicalize_url
+
+# Parser instances are reused within each process
+_link_parsers = {}
+
+_HEADER_CHARSET = re.compile(r'charset=["\']?([\w.:-]+)', re.I)
+_META_CHARSET = re.compile(rb'<meta[^>]+charset=["\']?([\w.:-]+)', re.I)
+
+def detect_encoding(body, content_type=''):
+    """Pick a body's encoding from the Content-Type charset or a <meta> tag.
+
+    Unlike `response.text` this never falls back to statistical detection,
+    which scans the whole body; undeclared pages are read as UTF-8.
+    """
+    header = _HEADER_CHARSET.search(content_type)
+    meta = _META_CHARSET.search(body[:2048])
+    for declared in (header and header.group(1), meta and meta.group(1).decode('ascii')):
+        if declared:
+            try:
+                return codecs.lookup(declared).name
+            except LookupError:
+                pass
+    return 'utf-8'
+
+def extract_endpoint_name(path):
+    """Extract a human-readable endpoint name from the URL path"""
+    parts = path.strip('/').split('/')
+    if parts[-1]:
+        name = parts[-1]
+    elif len(parts) > 1:
+        name = parts[-2]
+    else:
+        name = 'home'
+
+    return name.replace('-', ' ').replace('_', ' ').title()
+
+def endpoint_fields(parsed_url):
+    path = parsed_url.path
+    if not path:
+        path = '/'
+
+    return {
+        'endpoint_name': extract_endpoint_name(path),
+        'path': path
+    }
+
+def extract_endpoints(hrefs, base_url, site_url=None):
+    """Extract the links to `site_url`'s host from the page's anchor hrefs, resolved against `base_url`.
+
+    `site_url` defaults to `base_url`. A page whose redirect left the site
+    has no internal links.
+    """
+    site_domain = urlparse(canonicalize_url(site_url or base_url)).netloc
+    if urlparse(canonicalize_url(base_url)).netloc != site_domain:
+        return {}
+    endpoints = {}
+
+    for href in hrefs:
+        if not href or href.startswith(('#', 'javascript:', 'mailto:', 'tel:')):
+            continue
+
+        # Convert relative URLs to absolute, canonical URLs so variants dedupe
+        try:
+            absolute_url = canonicalize_url(urljoin(base_url, href))
+        except ValueError:
+            # Malformed, such as an unclosed IPv6 bracket or a non-numeric port
+            continue
+        parsed_url = urlparse(absolute_url)
+
+        # Only process internal links
+        if parsed_url.netloc == site_domain and absolute_url not in endpoints:
+            endpoints[absolute_url] = endpoint_fields(parsed_url)
+
+    return endpoints
+
+def parse_page(body, base_url, content_type='', backend='auto', site_url=None):
+    """Parse a raw page body and return its encoding, title, internal links and SimHash.
+
+    `base_url` is the URL the body was actually fetched from, after
+    redirects; relative links resolve against it, not the canonical URL.
+    Links count as internal when they are on `site_url`'s host, the job's
+    start page; it defaults to `base_url`.
+    """
+    if backend not in _link_parsers:
+        _link_parsers[backend] = get_link_parser(backend)
+    encoding = detect_encoding(body, content_type)
+    html = body.decode(encoding, errors='replace')
+    page = _link_parsers[backend].parse(html)
+    endpoints = extract_endpoints(page.links, base_url, site_url)
+    return {
+        'encoding': encoding,
+        'title': (page.title or '').strip()[:500],
+        'endpoints': endpoints,
+        # Canonical links, so session IDs and tracking parameters don't make copies look distinct
+        'simhash': simhash(html, endpoints),
+    }
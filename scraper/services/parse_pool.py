@@ -0,0 +1,21 @@
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_parse_pool(workers):
+    """Process-wide pool of parser processes shared by every running job.
+
+    Processes are spawned rather than forked: the web and worker processes
+    run threads, and forking a threaded process can deadlock the child.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+        return _pool
@@ -0,0 +1,127 @@
+import asyncio
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+# Responses asking us to slow down
+THROTTLE_STATUSES = {429, 503}
+
+def parse_retry_after(value, default):
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)"""
+    if not value:
+        return default
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return default
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+class HostBucket:
+    """Token bucket for a single host whose refill rate adapts to the host's health"""
+
+    # Latency above this multiple of the host's best observed latency means it is struggling
+    SLOWDOWN_FACTOR = 2.0
+    # ...as long as it is also this many seconds slower, so jitter on fast hosts is ignored
+    SLOWDOWN_MARGIN = 0.1
+    # Good responses needed to climb from the minimum to the maximum rate
+    RAMP_STEPS = 20
+    # Exponential moving average weight given to each new latency sample
+    LATENCY_SMOOTHING = 0.3
+
+    def __init__(self, rate, min_rate, max_rate):
+        self.rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.tokens = 1.0
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.latency = None
+        self.best_latency = None
+
+    def reserve(self):
+        """Take a token and return how long the caller must wait before using it"""
+        now = time.monotonic()
+        # Capacity of one token keeps requests evenly spaced rather than bursty
+        self.tokens = min(1.0, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1.0
+        wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        return max(wait, self.paused_until - now)
+
+    def pause(self, seconds):
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+    def slow_down(self):
+        self.rate = max(self.min_rate, self.rate / 2)
+
+    def observe_latency(self, latency):
+        """Additive increase while the host stays fast, multiplicative decrease when it lags"""
+        if self.latency is None:
+            self.latency = latency
+        else:
+            self.latency += self.LATENCY_SMOOTHING * (latency - self.latency)
+        if self.best_latency is None or self.latency < self.best_latency:
+            self.best_latency = self.latency
+
+        threshold = max(self.best_latency * self.SLOWDOWN_FACTOR, self.best_latency + self.SLOWDOWN_MARGIN)
+        if self.latency > threshold:
+            self.rate = max(self.min_rate, self.rate * 0.75)
+        else:
+            self.rate = min(self.max_rate, self.rate + self.max_rate / self.RAMP_STEPS)
+
+class PolitenessScheduler:
+    """Spaces requests per host instead of sleeping a fixed delay before each one.
+
+    Each host gets its own token bucket starting at `rate` requests/second.
+    Fast responses raise the rate towards `max_rate`; slow responses, errors
+    and 429/503 answers lower it, and Retry-After pauses the host entirely.
+    """
+
+    def __init__(self, rate, max_rate, min_rate=0.1, default_backoff=30, max_backoff=600):
+        self.rate = rate
+        self.max_rate = max(rate, max_rate)
+        self.min_rate = min(min_rate, rate)
+        self.default_backoff = default_backoff
+        self.max_backoff = max_backoff
+        self._buckets = {}
+
+    def _bucket(self, host):
+        if host not in self._buckets:
+            self._buckets[host] = HostBucket(self.rate, self.min_rate, self.max_rate)
+        return self._buckets[host]
+
+    async def wait(self, host):
+        """Wait for the host's next request slot"""
+        delay = self._bucket(host).reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def record_response(self, host, status_code, latency, retry_after=None):
+        """Adapt the host's rate to a response; returns True if it was throttled"""
+        bucket = self._bucket(host)
+        if status_code in THROTTLE_STATUSES:
+            bucket.slow_down()
+            bucket.pause(min(self.max_backoff, parse_retry_after(retry_after, self.default_backoff)))
+            return True
+        bucket.observe_latency(latency)
+        return False
+
+    def set_crawl_delay(self, host, seconds):
+        """Never request more often than the host's robots.txt Crawl-delay allows"""
+        bucket = self._bucket(host)
+        bucket.max_rate = min(bucket.max_rate, 1 / seconds)
+        bucket.min_rate = min(bucket.min_rate, bucket.max_rate)
+        bucket.rate = min(bucket.rate, bucket.max_rate)
+
+    def record_error(self, host):
+        """Connection errors and timeouts count as the host struggling"""
+        self._bucket(host).slow_down()
+
+    def host_rates(self):
+        return {host: round(bucket.rate, 2) for host, bucket in self._buckets.items()}
@@ -1,14 +1,43 @@
+import asyncio
+import logging
 import requests
-from bs4 import BeautifulSoup
+import threading
+import time
+from asgiref.sync import sync_to_async
+from tenacity import AsyncRetrying, retry_if_exception_type, stop_after_attempt, wait_random_exponential
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import urljoin, urlparse, urlsplit
 from django.utils import timezone
 from django.conf import settings
-import os
+from django.db import transaction
+from django.db.models import Count
 from pathlib import Path
 import re
 import random
-import time
-from ..models import ScrapingJob, ScrapedContent, WebsiteEndpoint
+from ..models import ScrapingJob, ScrapedContent
+from .blob_store import blob_store
+from .circuit_breaker import CircuitBreaker
+from .crawl_traps import TemplateBudget
+from .endpoint_store import EndpointBatcher
+from .export_cache import export_cache
+from .frontier import CrawlFrontier
+from .page_parser import endpoint_fields, parse_page
+from .parse_pool import get_parse_pool
+from .http_client import connection_stats, get_session
+from .incremental import conditional_headers, load_previous_pages
+from .near_duplicates import SimHashIndex
+from .politeness import PolitenessScheduler
+from .seen_set import build_seen_set
+from .site_discovery import fetch_robots, iter_sitemap_urls
+from .telemetry import CrawlTelemetry, log_event
+from .url_classifier import classifier_for
+from .url_priority import UNCHANGED_PENALTY, link_priorities
+from .url_canonical import canonicalize_url
+
+logger = logging.getLogger(__name__)
+
+# Caps the number of in-flight fetches across every job running in this process
+_fetch_slots = threading.BoundedSemaphore(getattr(settings, 'SCRAPER_GLOBAL_CONCURRENCY', 32))
 
 class WebScraper:
     # Common user agents list
@@ -19,35 +48,382 @@ class WebScraper:
         'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) Safari/605.1.15',
         'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Edge/91.0.864.59'
     ]
-    
+
+    # Times a URL is re-queued after the host answers 429/503
+    THROTTLE_RETRIES = 3
+
+    # Failures worth retrying; anything else (bad URL, redirect loop) fails at once
+    TRANSIENT_ERRORS = (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError)
+
     def __init__(self, job_id):
         self.job = ScrapingJob.objects.get(id=job_id)
-        self.visited_urls = set()
-        
-        # Create website-specific storage directory with job ID
-        timestamp = timezone.now().strftime('%Y%m%d_%H%M%S')
-        website_name = self._get_clean_website_name(self.job.url)
-        self.storage_path = Path(settings.MEDIA_ROOT) / 'scraped_content' / f"job_{self.job.id}_{website_name}_{timestamp}"
-        self.storage_path.mkdir(parents=True, exist_ok=True)
+        self.frontier = CrawlFrontier(self.job)
+        self.session = get_session()
+        self.parser_backend = getattr(settings, 'SCRAPER_PARSER_BACKEND', 'auto')
+        self.parse_workers = getattr(settings, 'SCRAPER_PARSE_WORKERS', 0)
+        # The site's profile patterns, loaded once per run
+        self.classifier = classifier_for(self.job.url)
+        self.endpoints = EndpointBatcher(
+            self.job,
+            build_seen_set(
+                self.job,
+                capacity=getattr(settings, 'SCRAPER_BLOOM_CAPACITY', 1_000_000),
+                error_rate=getattr(settings, 'SCRAPER_BLOOM_ERROR_RATE', 0.01)
+            ),
+            self.classifier,
+            batch_size=getattr(settings, 'SCRAPER_ENDPOINT_BATCH_SIZE', 500)
+        )
+        self.concurrency = max(1, self.job.max_concurrency)
+        self.scheduler = PolitenessScheduler(
+            rate=self.job.host_rate,
+            max_rate=self.job.max_host_rate,
+            default_backoff=getattr(settings, 'SCRAPER_RETRY_AFTER_DEFAULT', 30),
+            max_backoff=getattr(settings, 'SCRAPER_RETRY_AFTER_MAX', 600)
+        )
+        self._throttle_retries = {}
+        self.breaker = CircuitBreaker(
+            threshold=getattr(settings, 'SCRAPER_BREAKER_THRESHOLD', 5),
+            cooldown=getattr(settings, 'SCRAPER_BREAKER_COOLDOWN', 30),
+            max_cooldown=getattr(settings, 'SCRAPER_BREAKER_MAX_COOLDOWN', 600),
+            max_trips=getattr(settings, 'SCRAPER_BREAKER_MAX_TRIPS', 5)
+        )
+        self.fetch_retries = getattr(settings, 'SCRAPER_FETCH_RETRIES', 2)
+        self.retry_backoff = getattr(settings, 'SCRAPER_RETRY_BACKOFF', 1)
+        self.max_attempts = getattr(settings, 'SCRAPER_MAX_ATTEMPTS', 3)
+        self.max_page_bytes = getattr(settings, 'SCRAPER_MAX_PAGE_BYTES', 10 * 1024 * 1024)
+        self.skip_extensions = tuple(getattr(settings, 'SCRAPER_SKIP_EXTENSIONS', ()))
+        self.respect_robots = getattr(settings, 'SCRAPER_RESPECT_ROBOTS', True)
+        self.use_sitemaps = getattr(settings, 'SCRAPER_USE_SITEMAPS', True)
+        self.robots = None
+        self.templates = TemplateBudget(self.job.max_urls_per_template, self.classifier)
+        # Pages from the previous crawl of this site, for incremental jobs
+        self.previous = {}
+        self.near_duplicates = SimHashIndex()
+        self.checkpoint_interval = getattr(settings, 'SCRAPER_CHECKPOINT_INTERVAL', 10)
+        # Resumed jobs keep adding to the timings saved by earlier runs
+        self.telemetry = CrawlTelemetry(
+            self.job.id,
+            self.job.telemetry,
+            slow_phase_seconds=getattr(settings, 'SCRAPER_SLOW_PHASE_SECONDS', 5)
+        )
+
+        # Website-specific directory for the job's files, such as its WARC export, reused on resume
+        if not self.job.storage_path:
+            timestamp = timezone.now().strftime('%Y%m%d_%H%M%S')
+            website_name = self._get_clean_website_name(self.job.url)
+            self.job.storage_path = str(Path('scraped_content') / f"job_{self.job.id}_{website_name}_{timestamp}")
+        self.storage_path = Path(settings.MEDIA_ROOT) / self.job.storage_path
 
     def start_scraping(self):
+        self._run(resume=False)
+
+    def resume_scraping(self):
+        """Pick an interrupted job back up from its last checkpoint"""
+        self._run(resume=True)
+
+    def _run(self, resume):
         try:
+            if self.job.previous_job_id:
+                self.previous = load_previous_pages(self.job.previous_job)
+
+            if resume:
+                self.frontier.recover()
+                self._recover_endpoints()
+                counts = self.frontier.counts()
+                self.job.pages_scraped = counts.get('DONE', 0)
+                self.job.pages_queued = counts.get('PENDING', 0)
+                self.job.pages_failed = counts.get('FAILED', 0)
+                self.job.pages_duplicate = self._recover_duplicate_index()
+                changes = dict(
+                    self.job.contents.exclude(change='').values('change').annotate(total=Count('id'))
+                    .values_list('change', 'total')
+                )
+                self.job.pages_added = changes.get('ADDED', 0)
+                self.job.pages_changed = changes.get('CHANGED', 0)
+                self.job.pages_unchanged = changes.get('UNCHANGED', 0)
+                self.templates.load(self.job.frontier.values_list('url', flat=True).iterator(chunk_size=2000))
+                self.job.error_message = None
+
+            # Exports of the job's earlier data are stale from here on
+            self.job.data_version += 1
+            export_cache.invalidate(self.job.id)
+
             self.job.status = 'IN_PROGRESS'
+            self.job.stop_reason = ''
+            self.job.started_at = self.job.started_at or timezone.now()
+            self.job.last_checkpoint_at = timezone.now()
             self.job.save()
-            
-            # Scrape the initial URL
-            self._scrape_url(self.job.url)
-            
+
+            # Crawl the site starting from the initial URL
+            before = connection_stats()
+            asyncio.run(self._crawl())
+            self._log_connection_reuse(before, connection_stats())
+
+            if self.job.previous_job_id and not self.job.stop_reason:
+                # Pages the previous crawl stored that this one never reached or could not fetch
+                self.job.pages_removed = (
+                    self.job.previous_job.contents
+                    .exclude(url__in=self.job.contents.values('url'))
+                    .count()
+                )
+
             self.job.status = 'COMPLETED'
             self.job.completed_at = timezone.now()
+            self.job.telemetry = self.telemetry.state()
             self.job.save()
-            
+            self.telemetry.log_summary()
+
         except Exception as e:
             self.job.status = 'FAILED'
             self.job.error_message = str(e)
+            self.job.telemetry = self.telemetry.state()
             self.job.save()
             raise
 
+    def _recover_endpoints(self):
+        """Rebuild endpoints from the frontier if their batch was lost when the crawl stopped"""
+        discovered = self.job.frontier.values_list('url', flat=True).iterator(chunk_size=2000)
+        batch = {}
+        for url in discovered:
+            batch[url] = endpoint_fields(urlparse(url))
+            if len(batch) >= 2000:
+                self.endpoints.add(batch)
+                batch = {}
+        self.endpoints.add(batch)
+        self.endpoints.flush()
+
+    def _recover_duplicate_index(self):
+        """Re-index stored pages' fingerprints and return how many were near-duplicates"""
+        stored = self.job.contents.filter(simhash__isnull=False).values_list('id', 'simhash', 'duplicate_of')
+        duplicates = 0
+        for content_id, fingerprint, duplicate_of in stored.iterator(chunk_size=2000):
+            if duplicate_of is None:
+                self.near_duplicates.add(fingerprint, content_id)
+            else:
+                duplicates += 1
+        return duplicates
+
+    def _log_connection_reuse(self, before, after):
+        requests_made = after['requests'] - before['requests']
+        new_connections = after['new_connections'] - before['new_connections']
+        if requests_made:
+            logger.info(
+                "Job %s made %d requests over %d new connections (%.0f%% reused)",
+                self.job.id, requests_made, new_connections,
+                100 * (requests_made - new_connections) / requests_made
+            )
+
+    def _checkpoint(self, force=False):
+        """Persist crawl counters and buffered endpoints; frontier state is saved page by page"""
+        now = timezone.now()
+        if not force and (now - self.job.last_checkpoint_at).total_seconds() < self.checkpoint_interval:
+            return
+        with self.telemetry.phase('endpoint_write'):
+            self.endpoints.flush()
+        self.job.pages_queued = self.frontier.pending_count()
+        self.job.last_checkpoint_at = now
+        self.job.telemetry = self.telemetry.state()
+        self.job.save(update_fields=[
+            'pages_scraped', 'pages_queued', 'pages_failed', 'bytes_downloaded', 'pages_duplicate',
+            'urls_trapped', 'pages_added', 'pages_changed', 'pages_unchanged', 'last_checkpoint_at', 'stop_reason',
+            'telemetry'
+        ])
+
+    async def _discover(self):
+        """Load robots.txt rules and queue the pages the site's sitemaps list"""
+        if not (self.respect_robots or self.use_sitemaps):
+            return
+        root_url = canonicalize_url(self.job.url)
+        host = urlsplit(root_url).netloc
+        headers = {'User-Agent': random.choice(self.USER_AGENTS)}
+        # Fetches run on the job's threads; only seeding goes through the DB thread every job shares
+        robots = await self._run_blocking(self._fetch_robots, root_url, headers)
+
+        if self.respect_robots:
+            self.robots = robots
+            crawl_delay = robots.crawl_delay('*')
+            if crawl_delay:
+                self.scheduler.set_crawl_delay(host, float(crawl_delay))
+
+        if not self.use_sitemaps:
+            return
+        entries = iter_sitemap_urls(
+            self.session,
+            robots.site_maps() or [urljoin(root_url, '/sitemap.xml')],
+            headers,
+            max_bytes=getattr(settings, 'SCRAPER_SITEMAP_MAX_BYTES', 50 * 1024 * 1024),
+            limit=getattr(settings, 'SCRAPER_SITEMAP_LIMIT', 50)
+        )
+        seeded = 0
+        while True:
+            batch, lastmod = await self._run_blocking(self._read_sitemap_batch, entries, host)
+            if not batch:
+                break
+            seeded += await sync_to_async(self._seed)(batch, lastmod)
+            # Large sitemaps take a while; keep the heartbeat going
+            await sync_to_async(self._checkpoint)()
+        logger.info("Job %s queued %d pages from sitemaps", self.job.id, seeded)
+
+    def _fetch_robots(self, root_url, headers):
+        with _fetch_slots:
+            return fetch_robots(self.session, root_url, headers)
+
+    def _read_sitemap_batch(self, entries, host, size=1000):
+        """Read up to `size` of the host's pages from the sitemap entries; empty once they run out"""
+        batch, lastmod = {}, {}
+        for entry in entries:
+            try:
+                url = canonicalize_url(entry.url)
+            except ValueError:
+                continue
+            parsed_url = urlparse(url)
+            # Sitemaps may only list their own host's pages; ignore anything else
+            if parsed_url.netloc != host:
+                continue
+            batch[url] = endpoint_fields(parsed_url)
+            lastmod[url] = entry.lastmod
+            if len(batch) >= size:
+                break
+        return batch, lastmod
+
+    def _seed(self, endpoints, lastmod):
+        """Record sitemap URLs as endpoints and queue the new ones one level below the start page"""
+        new_urls = self.endpoints.add(endpoints)
+        priorities = link_priorities(endpoints, new_urls, 1, self.classifier)
+        for url in new_urls:
+            previous = self.previous.get(url)
+            if previous and lastmod.get(url) and lastmod[url] <= previous.scraped_at:
+                # Unchanged since the previous crawl by the sitemap's word: still checked, but last
+                priorities[url] -= UNCHANGED_PENALTY
+        self.frontier.add(new_urls, 1, lastmod, priorities)
+        return len(new_urls)
+
+    async def _crawl(self):
+        """Drain the persistent frontier with up to `concurrency` fetches in flight"""
+        self._queue = asyncio.Queue()
+        self._outstanding = 0
+        self._progress = asyncio.Event()
+        self._failure = None
+        await sync_to_async(self.frontier.add)([canonicalize_url(self.job.url)], 0)
+
+        # Backpressure: fetchers wait here instead of piling pages up ahead of the parsers
+        self._parse_slots = asyncio.Semaphore(max(1, self.parse_workers) * 2)
+
+        with ThreadPoolExecutor(max_workers=self.concurrency,
+                                thread_name_prefix=f'scraper-job-{self.job.id}') as executor:
+            self._executor = executor
+            await self._discover()
+            workers = [asyncio.create_task(self._worker()) for _ in range(self.concurrency)]
+            try:
+                await self._feed_workers()
+            finally:
+                for worker in workers:
+                    worker.cancel()
+                await asyncio.gather(*workers, return_exceptions=True)
+                await sync_to_async(self._checkpoint)(force=True)
+
+    def _exhausted_budget(self):
+        """The first of the job's page, byte and time budgets that is used up, if any"""
+        job = self.job
+        if job.max_pages is not None and job.pages_scraped >= job.max_pages:
+            return 'pages'
+        if job.max_bytes is not None and job.bytes_downloaded >= job.max_bytes:
+            return 'bytes'
+        if job.max_duration is not None and (timezone.now() - job.started_at).total_seconds() >= job.max_duration:
+            return 'time'
+        return ''
+
+    async def _release_queued(self):
+        """Hand claimed pages that no worker has started yet back to the frontier"""
+        released = []
+        while not self._queue.empty():
+            released.append(self._queue.get_nowait()[0])
+        self._outstanding -= len(released)
+        await sync_to_async(self.frontier.release)(released)
+
+    async def _feed_workers(self):
+        """Claim frontier batches until nothing is pending and no page is in flight"""
+        batch_size = self.concurrency * 2
+        while True:
+            # Clear before claiming so a page finishing mid-claim still wakes us
+            self._progress.clear()
+            if self._failure:
+                raise self._failure
+
+            if not self.job.stop_reason:
+                self.job.stop_reason = self._exhausted_budget()
+                if self.job.stop_reason:
+                    logger.info("Job %s stopping: %s budget reached", self.job.id, self.job.stop_reason)
+                    await self._release_queued()
+
+            if self.job.stop_reason:
+                # Let pages already being fetched finish, then stop
+                if self._outstanding == 0:
+                    return
+            elif self._outstanding < batch_size:
+                limit = batch_size - self._outstanding
+                if self.job.max_pages is not None:
+                    # Don't start more pages than the page budget has left
+                    limit = min(limit, self.job.max_pages - self.job.pages_scraped - self._outstanding)
+                # Only an idle crawl can conclude the frontier is exhausted
+                idle = self._outstanding == 0
+                batch = []
+                if limit > 0:
+                    with self.telemetry.phase('frontier'):
+                        batch = await sync_to_async(self.frontier.claim)(limit)
+                for entry in batch:
+                    self._queue.put_nowait(entry)
+                self._outstanding += len(batch)
+                if batch:
+                    continue
+                if idle:
+                    return
+
+            try:
+                # Wake up periodically so a time budget is noticed while hosts are paused
+                await asyncio.wait_for(self._progress.wait(), timeout=1)
+            except asyncio.TimeoutError:
+                # Keep the heartbeat going while no page finishes, so the job isn't taken for stale
+                await sync_to_async(self._checkpoint)()
+
+    async def _worker(self):
+        while True:
+            entry_id, url, depth, attempts = await self._queue.get()
+            try:
+                state = await self._scrape_url(url, depth)
+                # Frontier timings include waiting for the shared DB thread
+                with self.telemetry.phase('frontier', url):
+                    if state == 'RETRY' and attempts + 1 < self.max_attempts:
+                        await sync_to_async(self.frontier.retry)(entry_id)
+                    else:
+                        state = 'FAILED' if state == 'RETRY' else state
+                        await sync_to_async(self.frontier.mark)(entry_id, state)
+                if state == 'DONE':
+                    self.job.pages_scraped += 1
+                elif state == 'FAILED':
+                    self.job.pages_failed += 1
+                await sync_to_async(self._checkpoint)()
+            except Exception as e:
+                # Unexpected errors fail the whole job, as before
+                self._failure = self._failure or e
+            finally:
+                self._outstanding -= 1
+                self._progress.set()
+
+    async def _run_blocking(self, func, *args):
+        """Run blocking network or parsing work on the job's thread pool"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+
+    async def _parse(self, body, url, content_type):
+        """Parse in the shared process pool when configured, else on the job's threads"""
+        args = (parse_page, body, url, content_type, self.parser_backend, self.job.url)
+        async with self._parse_slots:
+            if self.parse_workers:
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(get_parse_pool(self.parse_workers), *args)
+            return await self._run_blocking(*args)
+
     def _get_clean_website_name(self, url):
         """Extract and clean website name from URL"""
         parsed = urlparse(url)
@@ -55,128 +431,223 @@ class WebScraper:
         # Remove invalid characters and return clean name
         return re.sub(r'[^\w\-_]', '_', domain)
 
-    def _get_clean_filename(self, url):
-        """Generate clean filename from URL"""
-        parsed = urlparse(url)
-        path = parsed.path.strip('/')
-        
-        if not path:
-            return 'index.html'
-            
-        # Clean the path to create a valid filename
-        filename = re.sub(r'[^\w\-_]', '_', path)
-        if not filename.endswith('.html'):
-            filename += '.html'
-            
-        return filename
-
-    def _ensure_unique_filename(self, base_filename):
-        """Ensure filename is unique in the storage directory"""
-        counter = 1
-        filename = base_filename
-        while (self.storage_path / filename).exists():
-            name, ext = os.path.splitext(base_filename)
-            filename = f"{name}_{counter}{ext}"
-            counter += 1
-        return filename
-
-    def _save_html_file(self, content, job_id, url):
-        # Generate filename from URL
-        base_filename = self._get_clean_filename(url)
-        filename = self._ensure_unique_filename(base_filename)
-        file_path = self.storage_path / filename
-        
-        # Save the HTML content to file
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(content)
-        
-        return str(file_path.relative_to(settings.MEDIA_ROOT))
-
-    def _extract_endpoint_name(self, path):
-        """Extract a human-readable endpoint name from the URL path"""
-        parts = path.strip('/').split('/')
-        if parts[-1]:
-            name = parts[-1]
-        elif len(parts) > 1:
-            name = parts[-2]
+    def _fetch(self, url):
+        """Fetch a page and return (response, body, bytes read), recording its timing"""
+        # Use random user agent for each request
+        headers = {
+            'User-Agent': random.choice(self.USER_AGENTS)
+        }
+        # Re-crawls ask the server to answer 304 if the page hasn't changed
+        if url in self.previous:
+            headers.update(conditional_headers(self.previous[url]))
+        with _fetch_slots:
+            started = time.perf_counter()
+            response, body, received = self._download(url, headers)
+            seconds = time.perf_counter() - started
+        self.telemetry.record_phase('fetch', seconds, url)
+        self.telemetry.record_response(urlsplit(url).netloc, response.status_code, received, seconds)
+        return response, body, received
+
+    def _download(self, url, headers):
+        """Stream a page's body.
+
+        Headers are checked before the body is read: non-HTML responses and
+        bodies over SCRAPER_MAX_PAGE_BYTES come back with a body of None, and
+        their connection is dropped instead of paying for the transfer.
+        """
+        response = self.session.get(url, headers=headers, timeout=10, stream=True)
+        with response:
+            if response.status_code == 304:
+                return response, None, 0
+            content_type = response.headers.get('content-type', '').lower()
+            if response.ok and 'text/html' not in content_type:
+                return response, None, 0
+            try:
+                declared = int(response.headers.get('content-length', 0))
+            except ValueError:
+                declared = 0
+            if declared > self.max_page_bytes:
+                logger.info("Skipping %s: declares %d bytes", url, declared)
+                return response, None, 0
+
+            # Error pages are read too, so their keep-alive connection can be reused
+            body = bytearray()
+            for chunk in response.iter_content(64 * 1024):
+                body += chunk
+                if len(body) > self.max_page_bytes:
+                    logger.info("Skipping %s: body exceeds %d bytes", url, self.max_page_bytes)
+                    return response, None, len(body)
+            return response, bytes(body), len(body)
+
+    def _store_page(self, url, body, page, depth, headers):
+        duplicate_of = self.near_duplicates.find(page['simhash'])
+        if duplicate_of is not None:
+            # Only counted: listing pages look alike but each links to different items,
+            # and links already seen are filtered out below anyway
+            self.job.pages_duplicate += 1
+
+        # New endpoints are buffered and bulk-inserted once a batch fills up
+        with self.telemetry.phase('endpoint_write', url):
+            new_urls = self.endpoints.add(page['endpoints'])
+        # Calendars and facets mint endless URLs; each path template gets a budget
+        queued = self.templates.admit(new_urls)
+        self.job.urls_trapped += len(new_urls) - len(queued)
+
+        previous = self.previous.get(url)
+        # 304 responses carry no validators of their own; keep the stored ones
+        etag = headers.get('ETag') or (previous.etag if previous else '')
+        last_modified = headers.get('Last-Modified') or (previous.last_modified if previous else '')
+        change = ''
+
+        if previous and previous.content_hash == blob_store.digest(body):
+            # Unchanged since the last crawl: point at the stored copy instead of writing it again
+            change = 'UNCHANGED'
+            self.job.pages_unchanged += 1
+            stored = {
+                field: getattr(previous, field)
+                for field in ('content_hash', 'content_size', 'encoding', 'html_preview')
+            }
         else:
-            name = 'home'
-            
-        return name.replace('-', ' ').replace('_', ' ').title()
-
-    def _extract_endpoints(self, soup, base_url):
-        """Extract all internal links from the page"""
-        base_domain = urlparse(base_url).netloc
-        
-        for anchor in soup.find_all('a', href=True):
-            href = anchor.get('href')
-            if not href or href.startswith(('#', 'javascript:', 'mailto:', 'tel:')):
-                continue
-                
-            # Convert relative URLs to absolute URLs
-            absolute_url = urljoin(base_url, href)
-            parsed_url = urlparse(absolute_url)
-            
-            # Only process internal links
-            if parsed_url.netloc == base_domain:
-                path = parsed_url.path
-                if not path:
-                    path = '/'
-                    
-                endpoint_name = self._extract_endpoint_name(path)
-                
-                # Store the endpoint
-                WebsiteEndpoint.objects.get_or_create(
-                    job=self.job,
-                    url=absolute_url,
-                    defaults={
-                        'endpoint_name': endpoint_name,
-                        'path': path
-                    }
-                )
-                
-                # Add to URLs to visit if not already visited
-                if absolute_url not in self.visited_urls:
-                    self._scrape_url(absolute_url)
+            if self.job.previous_job_id:
+                change = 'CHANGED' if previous else 'ADDED'
+                if previous:
+                    self.job.pages_changed += 1
+                else:
+                    self.job.pages_added += 1
 
-    def _scrape_url(self, url):
-        if url in self.visited_urls:
-            return
-            
-        self.visited_urls.add(url)
-        
-        # Add random delay between requests (2-5 seconds)
-        time.sleep(random.uniform(2, 5))
-        
-        try:
-            # Use random user agent for each request
-            headers = {
-                'User-Agent': random.choice(self.USER_AGENTS)
+            with self.telemetry.phase('file_write', url):
+                # The blob store is the only copy of a body; the row keeps the hash and a preview
+                content_hash, content_size = blob_store.put(body)
+
+            # A character takes at most four bytes in any encoding a page may declare
+            preview_bytes = body[:ScrapedContent.PREVIEW_LENGTH * 4]
+            preview = preview_bytes.decode(page['encoding'], errors='replace')[:ScrapedContent.PREVIEW_LENGTH]
+            stored = {
+                'content_hash': content_hash,
+                'content_size': content_size,
+                'encoding': page['encoding'],
+                'html_preview': preview,
             }
-            
-            response = requests.get(url, headers=headers, timeout=10)
-            response.raise_for_status()
-            
-            # Check if content is HTML
-            content_type = response.headers.get('content-type', '').lower()
-            if 'text/html' not in content_type:
-                return
-                
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # Extract and store endpoints
-            self._extract_endpoints(soup, url)
-            
-            # Save HTML content to file
-            file_path = self._save_html_file(response.text, self.job.id, url)
-            
+
+        with self.telemetry.phase('db_insert', url), transaction.atomic():
             # Store the scraped content
-            ScrapedContent.objects.create(
+            content = ScrapedContent.objects.create(
                 job=self.job,
-                html_content=response.text,
-                html_file_path=file_path,
-                url=url
+                title=page['title'],
+                simhash=page['simhash'],
+                duplicate_of_id=duplicate_of,
+                etag=etag[:255],
+                last_modified=last_modified[:64],
+                change=change,
+                url=url,
+                **stored
             )
-            
+
+            # Queue links seen for the first time one level deeper, profiles first
+            priorities = link_priorities(page['endpoints'], queued, depth + 1, self.classifier)
+            self.frontier.add(queued, depth + 1, priority=priorities)
+
+        if duplicate_of is None:
+            self.near_duplicates.add(page['simhash'], content.id)
+
+    async def _fetch_with_retries(self, url, host):
+        """Fetch, retrying timeouts and dropped connections with jittered exponential backoff"""
+        retrying = AsyncRetrying(
+            retry=retry_if_exception_type(self.TRANSIENT_ERRORS),
+            stop=stop_after_attempt(self.fetch_retries + 1),
+            wait=wait_random_exponential(multiplier=self.retry_backoff, max=self.retry_backoff * 8),
+            reraise=True
+        )
+        async for attempt in retrying:
+            with attempt:
+                with self.telemetry.phase('host_wait', url):
+                    # Wait for the host's next slot; other workers keep fetching meanwhile
+                    await self.scheduler.wait(host)
+                try:
+                    return await self._run_blocking(self._fetch, url)
+                except requests.RequestException as e:
+                    self.scheduler.record_error(host)
+                    self.telemetry.record_error(host, e)
+                    raise
+
+    async def _scrape_url(self, url, depth):
+        """Fetch, parse and store one page, returning its final frontier state"""
+        # Binary files are known by their extension; don't spend a request on them
+        if self.skip_extensions and urlsplit(url).path.lower().endswith(self.skip_extensions):
+            return 'SKIPPED'
+        if self.robots and not self.robots.can_fetch('*', url):
+            return 'SKIPPED'
+
+        host = urlparse(url).netloc
+        with self.telemetry.phase('host_wait', url):
+            # A paused host holds its requests instead of letting each one time out. Checked
+            # once per URL: retries of a probe must not wait behind the probe itself
+            probe = await self.breaker.wait(host)
+        try:
+            return await self._fetch_and_store(url, host, depth)
+        finally:
+            if probe:
+                # A no-op unless the probe ended without a success or failure being recorded
+                self.breaker.release(host)
+
+    async def _fetch_and_store(self, url, host, depth):
+        """Fetch, parse and store a page once the host's circuit lets the request through"""
+        try:
+            response, body, received = await self._fetch_with_retries(url, host)
+        except self.TRANSIENT_ERRORS as e:
+            self.breaker.record_failure(host)
+            log_event('fetch_retry', job=self.job.id, host=host, url=url, error=type(e).__name__)
+            return 'RETRY'
+        except requests.RequestException as e:
+            log_event('fetch_failed', logging.WARNING, job=self.job.id, host=host, url=url, error=e)
+            return 'FAILED'
+        self.job.bytes_downloaded += received
+
+        throttled = self.scheduler.record_response(
+            host,
+            response.status_code,
+            response.elapsed.total_seconds(),
+            response.headers.get('Retry-After')
+        )
+        if throttled:
+            if self._throttle_retries.get(url, 0) < self.THROTTLE_RETRIES:
+                # Back in the queue; the host stays paused until Retry-After passes
+                self._throttle_retries[url] = self._throttle_retries.get(url, 0) + 1
+                return 'PENDING'
+            # Still turned away after every retry: a struggling host, not a healthy one
+            self.breaker.record_failure(host)
+            log_event('fetch_failed', logging.WARNING, job=self.job.id, host=host, url=url, status=response.status_code)
+            return 'FAILED'
+
+        # Server errors count against the host and the URL is tried again later
+        if response.status_code >= 500:
+            self.breaker.record_failure(host)
+            log_event('fetch_retry', job=self.job.id, host=host, url=url, status=response.status_code)
+            return 'RETRY'
+        self.breaker.record_success(host)
+
+        content_type = response.headers.get('content-type', '')
+        previous = self.previous.get(url)
+        if response.status_code == 304 and previous:
+            # Not modified: the links still come from the copy stored last time
+            body = await self._run_blocking(blob_store.get, previous.content_hash)
+            content_type = f'text/html; charset={previous.encoding or "utf-8"}'
+
+        try:
+            response.raise_for_status()
+
+            # Non-HTML or oversized; rejected while streaming
+            if body is None:
+                return 'SKIPPED'
+
+            # Raw bytes go to the parser, which decodes them with the declared charset
+            with self.telemetry.phase('parse', url):
+                page = await self._parse(body, response.url or url, content_type)
+
+            # Django's ORM is synchronous; writes go through a single DB thread
+            await sync_to_async(self._store_page)(url, body, page, depth, response.headers)
+            return 'DONE'
+
         except requests.RequestException as e:
-            print(f"Error scraping {url}: {str(e)}")
\ No newline at end of file
+            log_event('page_failed', logging.WARNING, job=self.job.id, host=host, url=url, error=e)
+            return 'FAILED'
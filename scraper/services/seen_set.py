@@ -0,0 +1,84 @@
+import hashlib
+import math
+from ..models import WebsiteEndpoint
+
+class MemorySeenSet:
+    """Exact set of a job's known endpoint URLs, held entirely in memory"""
+
+    def __init__(self, job):
+        self._urls = set(WebsiteEndpoint.objects.filter(job=job).values_list('url', flat=True))
+
+    def filter_new(self, urls):
+        """Return the URLs not seen before and remember them"""
+        new = [url for url in dict.fromkeys(urls) if url not in self._urls]
+        self._urls.update(new)
+        return new
+
+    def flushed(self):
+        pass
+
+class BloomFilter:
+    def __init__(self, capacity, error_rate):
+        # Standard sizing: m = -n ln(p) / (ln 2)^2 bits and k = (m / n) ln 2 hashes
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, value):
+        digest = hashlib.blake2b(value.encode('utf-8'), digest_size=16).digest()
+        # Double hashing derives k positions from two 64-bit halves
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:], 'little') | 1
+        return [(first + i * second) % self.size for i in range(self.hash_count)]
+
+    def add(self, value):
+        for position in self._positions(value):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, value):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(value))
+
+class BloomSeenSet:
+    """Memory-bounded seen-set for very large crawls.
+
+    A Bloom filter answers "definitely new" without touching the database;
+    URLs it reports as possibly seen are confirmed with one exact query per
+    batch against the job's stored endpoints. `pending` holds URLs accepted
+    but not yet flushed to the database, so they are not accepted twice.
+    """
+
+    # Stay well under SQLite's bound-parameter limit
+    QUERY_CHUNK = 500
+
+    def __init__(self, job, capacity, error_rate):
+        self.job = job
+        self.bloom = BloomFilter(capacity, error_rate)
+        self.pending = set()
+        for url in WebsiteEndpoint.objects.filter(job=job).values_list('url', flat=True).iterator():
+            self.bloom.add(url)
+
+    def filter_new(self, urls):
+        urls = [url for url in dict.fromkeys(urls) if url not in self.pending]
+        maybe_seen = [url for url in urls if url in self.bloom]
+        stored = set()
+        for start in range(0, len(maybe_seen), self.QUERY_CHUNK):
+            stored.update(
+                WebsiteEndpoint.objects
+                .filter(job=self.job, url__in=maybe_seen[start:start + self.QUERY_CHUNK])
+                .values_list('url', flat=True)
+            )
+
+        new = [url for url in urls if url not in stored]
+        for url in new:
+            self.bloom.add(url)
+        self.pending.update(new)
+        return new
+
+    def flushed(self):
+        """Called once pending URLs are in the database"""
+        self.pending.clear()
+
+def build_seen_set(job, capacity, error_rate):
+    if job.seen_set == 'BLOOM':
+        return BloomSeenSet(job, capacity, error_rate)
+    return MemorySeenSet(job)
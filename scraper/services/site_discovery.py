@@ -0,0 +1,174 @@
+"""robots.txt rules and sitemap-driven URL discovery.
+
+Directory sites usually list every profile page in their sitemaps, so
+seeding the frontier from them finds pages without crawling each listing
+page. Sitemaps are streamed and parsed incrementally, gzipped or not, so
+a 50 MB sitemap never sits in memory whole.
+"""
+import logging
+import zlib
+from collections import namedtuple
+from datetime import datetime, time, timezone
+from urllib.parse import urljoin
+from urllib.robotparser import RobotFileParser
+from xml.etree.ElementTree import ParseError, XMLPullParser
+import requests
+from django.utils.dateparse import parse_date, parse_datetime
+
+logger = logging.getLogger(__name__)
+
+SitemapEntry = namedtuple('SitemapEntry', ['url', 'lastmod'])
+
+# Bytes of robots.txt read, as most search engines do; the rest is ignored
+ROBOTS_MAX_BYTES = 500 * 1024
+
+GZIP_MAGIC = b'\x1f\x8b'
+
+def _stream(session, url, headers, max_bytes):
+    """Yield the body of `url` in chunks, stopping once `max_bytes` have been read"""
+    with session.get(url, headers=headers, timeout=10, stream=True) as response:
+        response.raise_for_status()
+        received = 0
+        for chunk in response.iter_content(64 * 1024):
+            received += len(chunk)
+            if received > max_bytes:
+                logger.warning("Stopped reading %s after %d bytes", url, max_bytes)
+                return
+            yield chunk
+
+class RobotRules(RobotFileParser):
+    """RobotFileParser that also keeps fractional Crawl-delay values, which the stdlib drops"""
+
+    def __init__(self, url=''):
+        super().__init__(url)
+        self.delays = {}
+
+    def parse(self, lines):
+        lines = list(lines)
+        super().parse(lines)
+        self.delays = {}
+        agents, in_rules = [], False
+        for line in lines:
+            field, _, value = line.split('#', 1)[0].partition(':')
+            field, value = field.strip().lower(), value.strip()
+            if field == 'user-agent':
+                # User-agent lines after a group's rules start a new group
+                if in_rules:
+                    agents, in_rules = [], False
+                agents.append(value.lower())
+            elif field:
+                in_rules = True
+                if field == 'crawl-delay':
+                    try:
+                        delay = float(value)
+                    except ValueError:
+                        continue
+                    for agent in agents:
+                        self.delays.setdefault(agent, delay)
+
+    def crawl_delay(self, useragent):
+        useragent = useragent.split('/')[0].lower()
+        for agent, delay in self.delays.items():
+            if agent != '*' and agent in useragent:
+                return delay
+        return self.delays.get('*')
+
+def fetch_robots(session, root_url, headers):
+    """Fetch and parse the site's robots.txt, following urllib.robotparser's conventions.
+
+    401/403 disallow the whole site; a missing file or any other error
+    allows everything.
+    """
+    robots = RobotRules(urljoin(root_url, '/robots.txt'))
+    try:
+        with session.get(robots.url, headers=headers, timeout=10, stream=True) as response:
+            if response.status_code in (401, 403):
+                robots.disallow_all = True
+                return robots
+            if response.status_code >= 400:
+                robots.allow_all = True
+                return robots
+            body = b''
+            for chunk in response.iter_content(64 * 1024):
+                body += chunk
+                if len(body) >= ROBOTS_MAX_BYTES:
+                    break
+    except requests.RequestException as e:
+        logger.warning("Could not fetch %s: %s", robots.url, e)
+        robots.allow_all = True
+        return robots
+
+    robots.parse(body[:ROBOTS_MAX_BYTES].decode('utf-8', errors='replace').splitlines())
+    return robots
+
+def parse_lastmod(value):
+    """Parse a W3C datetime (a date, or a date and time) into an aware datetime"""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        parsed = parse_datetime(value)
+        if parsed is None:
+            day = parse_date(value)
+            parsed = datetime.combine(day, time()) if day else None
+    except ValueError:
+        return None
+    if parsed is not None and parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+def _local_name(tag):
+    return tag.rsplit('}', 1)[-1]
+
+def iter_sitemap(session, url, headers, max_bytes):
+    """Stream one sitemap, yielding ('url', SitemapEntry) and ('sitemap', nested sitemap URL) pairs"""
+    parser = XMLPullParser(events=('end',))
+    decompressor = None
+    first = True
+    loc = lastmod = None
+
+    for chunk in _stream(session, url, headers, max_bytes):
+        # .xml.gz files arrive still compressed; Content-Encoding: gzip is undone by requests
+        if first and chunk.startswith(GZIP_MAGIC):
+            decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        first = False
+        parser.feed(decompressor.decompress(chunk) if decompressor else chunk)
+
+        for _, element in parser.read_events():
+            name = _local_name(element.tag)
+            if name == 'loc':
+                loc = (element.text or '').strip()
+            elif name == 'lastmod':
+                lastmod = parse_lastmod(element.text)
+            elif name in ('url', 'sitemap'):
+                if loc and name == 'url':
+                    yield 'url', SitemapEntry(loc, lastmod)
+                elif loc:
+                    yield 'sitemap', loc
+                loc = lastmod = None
+                # Drop finished entries so memory stays flat however long the sitemap is
+                element.clear()
+
+def iter_sitemap_urls(session, sitemap_urls, headers, max_bytes, limit):
+    """Yield every page listed by the given sitemaps, following sitemap indexes.
+
+    At most `limit` sitemap files are read. A sitemap that is missing or
+    malformed is logged and skipped.
+    """
+    queue = list(dict.fromkeys(sitemap_urls))
+    seen = set(queue)
+    read = 0
+    while queue and read < limit:
+        sitemap_url = queue.pop(0)
+        read += 1
+        try:
+            for kind, value in iter_sitemap(session, sitemap_url, headers, max_bytes):
+                if kind == 'url':
+                    yield value
+                elif value not in seen:
+                    seen.add(value)
+                    queue.append(value)
+        except (requests.RequestException, ParseError, zlib.error) as e:
+            logger.info("Skipping sitemap %s: %s", sitemap_url, e)
+    if queue:
+        logger.warning("Sitemap limit of %d files reached; %d not read", limit, len(queue))
@@ -0,0 +1,219 @@
+"""Per-job crawl telemetry: where the time goes, per phase and per host.
+
+Each page passes through a few phases (waiting for its host's slot,
+fetching, parsing, writing endpoints, files and rows). Their latencies go
+into fixed-bucket histograms, so the state stays small and can be saved
+with the job's checkpoints and summed across resumes. Responses are
+counted by status code and by host.
+
+Slow phases and the per-host summary at the end of a crawl are logged as
+structured events: a `key=value` message for grepping, with the same
+fields on the record as `event` and `fields` for log formatters.
+"""
+import json
+import logging
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+PHASES = ('host_wait', 'fetch', 'parse', 'endpoint_write', 'file_write', 'db_insert', 'frontier')
+
+# Upper bounds of the histogram buckets in milliseconds; the last bucket is open-ended
+BUCKET_BOUNDS_MS = (
+    1, 2, 3, 5, 7, 10, 15, 25, 35, 50, 75, 100, 150, 250, 350, 500, 750,
+    1000, 1500, 2500, 5000, 10000, 30000
+)
+
+def _format_value(value):
+    value = str(value)
+    return json.dumps(value) if not value or ' ' in value or '"' in value else value
+
+def log_event(event, level=logging.INFO, **fields):
+    """Log `event` with its fields as `key=value` pairs"""
+    pairs = ' '.join(f'{key}={_format_value(value)}' for key, value in fields.items())
+    logger.log(level, '%s %s', event, pairs, extra={'event': event, 'fields': fields})
+
+class LatencyHistogram:
+    def __init__(self, state=None):
+        state = state or {}
+        self.buckets = list(state.get('buckets') or [])
+        if len(self.buckets) != len(BUCKET_BOUNDS_MS) + 1:
+            # Saved with different bucket bounds; the counts can't be mapped across
+            state, self.buckets = {}, [0] * (len(BUCKET_BOUNDS_MS) + 1)
+        self.count = state.get('count', 0)
+        self.total = state.get('total', 0.0)
+        self.max = state.get('max', 0.0)
+
+    def record(self, seconds):
+        ms = seconds * 1000
+        index = 0
+        while index < len(BUCKET_BOUNDS_MS) and ms > BUCKET_BOUNDS_MS[index]:
+            index += 1
+        self.buckets[index] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def percentile(self, fraction):
+        """Estimate in ms, interpolated within the bucket holding the given fraction of samples"""
+        if not self.count:
+            return 0
+        max_ms = self.max * 1000
+        rank = fraction * self.count
+        seen = 0
+        for index, count in enumerate(self.buckets):
+            if count and seen + count >= rank:
+                lower = BUCKET_BOUNDS_MS[index - 1] if index else 0
+                upper = BUCKET_BOUNDS_MS[index] if index < len(BUCKET_BOUNDS_MS) else max_ms
+                estimate = lower + (upper - lower) * (rank - seen) / count
+                return round(min(estimate, max_ms), 1)
+            seen += count
+        return round(max_ms, 1)
+
+    def state(self):
+        return {'buckets': self.buckets, 'count': self.count, 'total': self.total, 'max': self.max}
+
+    def summary(self):
+        return {
+            'count': self.count,
+            'total_seconds': round(self.total, 3),
+            'mean_ms': round(self.total * 1000 / self.count, 1) if self.count else 0,
+            'p50_ms': self.percentile(0.5),
+            'p95_ms': self.percentile(0.95),
+            'p99_ms': self.percentile(0.99),
+            'max_ms': round(self.max * 1000, 1),
+        }
+
+class CrawlTelemetry:
+    """Collects one job's timings and response counts; safe to update from any thread.
+
+    `state` is what a previous run of the job saved, so resumed jobs keep
+    adding to the same totals.
+    """
+
+    def __init__(self, job_id, state=None, slow_phase_seconds=5):
+        state = state or {}
+        self.job_id = job_id
+        self.slow_phase_seconds = slow_phase_seconds
+        self.phases = {name: LatencyHistogram(state.get('phases', {}).get(name)) for name in PHASES}
+        self.status_codes = Counter(state.get('status_codes', {}))
+        self.errors = Counter(state.get('errors', {}))
+        self.bytes = state.get('bytes', 0)
+        self.hosts = {
+            host: {**stats, 'latency': LatencyHistogram(stats.get('latency'))}
+            for host, stats in state.get('hosts', {}).items()
+        }
+        self._elapsed = state.get('elapsed', 0.0)
+        self._started = time.monotonic()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def phase(self, name, url=None):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record_phase(name, time.perf_counter() - started, url)
+
+    def record_phase(self, name, seconds, url=None):
+        with self._lock:
+            self.phases[name].record(seconds)
+        if seconds >= self.slow_phase_seconds:
+            log_event(
+                'slow_phase', logging.WARNING,
+                job=self.job_id, phase=name, seconds=round(seconds, 3), url=url
+            )
+
+    def _host(self, host):
+        if host not in self.hosts:
+            self.hosts[host] = {'requests': 0, 'bytes': 0, 'errors': 0, 'latency': LatencyHistogram()}
+        return self.hosts[host]
+
+    def record_response(self, host, status_code, received, seconds):
+        """Count a response; 5xx answers count as host errors"""
+        with self._lock:
+            self.status_codes[str(status_code)] += 1
+            self.bytes += received
+            stats = self._host(host)
+            stats['requests'] += 1
+            stats['bytes'] += received
+            stats['latency'].record(seconds)
+            if status_code >= 500:
+                stats['errors'] += 1
+
+    def record_error(self, host, error):
+        """Count a request that got no response at all"""
+        with self._lock:
+            self.errors[type(error).__name__] += 1
+            stats = self._host(host)
+            stats['requests'] += 1
+            stats['errors'] += 1
+
+    def state(self):
+        """JSON-serialisable state to save with the job"""
+        with self._lock:
+            return {
+                'elapsed': self._elapsed + time.monotonic() - self._started,
+                'phases': {name: histogram.state() for name, histogram in self.phases.items()},
+                'status_codes': dict(self.status_codes),
+                'errors': dict(self.errors),
+                'bytes': self.bytes,
+                'hosts': {
+                    host: {**stats, 'latency': stats['latency'].state()}
+                    for host, stats in self.hosts.items()
+                },
+            }
+
+    def log_summary(self, slowest=5):
+        """Log the job's phase totals and its slowest hosts"""
+        summary = performance_summary(self.state())
+        log_event(
+            'crawl_summary',
+            job=self.job_id,
+            seconds=summary['elapsed_seconds'],
+            requests=summary['requests'],
+            bytes=summary['bytes'],
+            **{f'{name}_seconds': phase['total_seconds'] for name, phase in summary['phases'].items()}
+        )
+        for host in summary['hosts'][:slowest]:
+            log_event(
+                'host_summary',
+                job=self.job_id, host=host['host'], requests=host['requests'], errors=host['errors'],
+                bytes=host['bytes'], p50_ms=host['p50_ms'], p95_ms=host['p95_ms']
+            )
+
+def performance_summary(state, pages=None):
+    """Readable statistics from saved telemetry state, hosts slowest first"""
+    state = state or {}
+    phases = {
+        name: LatencyHistogram(state.get('phases', {}).get(name)).summary()
+        for name in PHASES
+    }
+    hosts = []
+    for host, stats in state.get('hosts', {}).items():
+        latency = LatencyHistogram(stats.get('latency'))
+        hosts.append({
+            'host': host,
+            'requests': stats.get('requests', 0),
+            'errors': stats.get('errors', 0),
+            'bytes': stats.get('bytes', 0),
+            **{key: value for key, value in latency.summary().items() if key.endswith('_ms')}
+        })
+    hosts.sort(key=lambda host: (host['p95_ms'], host['mean_ms']), reverse=True)
+
+    elapsed = state.get('elapsed', 0.0)
+    summary = {
+        'elapsed_seconds': round(elapsed, 2),
+        'requests': sum(state.get('status_codes', {}).values()) + sum(state.get('errors', {}).values()),
+        'bytes': state.get('bytes', 0),
+        'status_codes': dict(sorted(state.get('status_codes', {}).items())),
+        'errors': state.get('errors', {}),
+        'phases': phases,
+        'hosts': hosts,
+    }
+    if pages is not None:
+        summary['pages_per_second'] = round(pages / elapsed, 2) if elapsed else 0
+    return summary
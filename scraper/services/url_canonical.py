@@ -0,0 +1,84 @@
+import posixpath
+import re
+import string
+from urllib.parse import parse_qsl, quote, urlencode, urlsplit, urlunsplit
+
+# Query parameters that only track the visitor and never change the page
+TRACKING_PARAMS = {
+    'gclid', 'dclid', 'fbclid', 'msclkid', 'yclid', 'igshid',
+    'mc_cid', 'mc_eid', '_hsenc', '_hsmi', '_ga', '_gl',
+    'phpsessid', 'jsessionid', 'sessionid',
+}
+TRACKING_PREFIXES = ('utm_',)
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+# Characters allowed unescaped in paths; anything else is percent-encoded
+_PATH_SAFE = "/:@!$&'()*+,;=-._~%"
+# Unreserved characters mean the same escaped or not (RFC 3986 section 2.3)
+_UNRESERVED = frozenset(string.ascii_letters + string.digits + '-._~')
+_ESCAPE = re.compile(r'%([0-9A-Fa-f]{2})')
+_STRAY_PERCENT = re.compile(r'%(?![0-9A-Fa-f]{2})')
+_SESSION_PATH_PARAM = re.compile(r';jsessionid=[^/?#]*', re.IGNORECASE)
+
+def _is_tracking_param(name):
+    name = name.lower()
+    return name in TRACKING_PARAMS or name.startswith(TRACKING_PREFIXES)
+
+def _normalize_escape(match):
+    char = chr(int(match.group(1), 16))
+    return char if char in _UNRESERVED else '%' + match.group(1).upper()
+
+def _normalize_path(path):
+    """Percent-encoding normalization as in RFC 3986 section 6.2.2.
+
+    Only escaped unreserved characters are decoded, so %7E, ~ and %7e all
+    compare equal while %2F or a Latin-1 %E9 keep their meaning; other
+    escapes are upper-cased and raw characters that need escaping are
+    encoded as UTF-8.
+    """
+    path = _SESSION_PATH_PARAM.sub('', path)
+    path = quote(_STRAY_PERCENT.sub('%25', path), safe=_PATH_SAFE)
+    path = _ESCAPE.sub(_normalize_escape, path)
+    if not path:
+        return '/'
+    # Resolve ./ and ../ segments
+    normalized = posixpath.normpath(path)
+    if normalized.startswith('//'):
+        normalized = '/' + normalized.lstrip('/')
+    # /about and /about/ are the same page; links resolve against the URL a
+    # fetch lands on, so a redirect to the slashed form is harmless
+    return normalized if normalized != '.' else '/'
+
+def canonicalize_url(url):
+    """Reduce a URL to the form used for de-duplication and storage.
+
+    Lower-cases the scheme and host, drops default ports, fragments and
+    tracking parameters, sorts the remaining query parameters, normalizes
+    percent-encoding, resolves dot segments and drops trailing slashes.
+    Raises ValueError for a URL that can't be parsed, such as one with an
+    invalid port.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+
+    host = (parts.hostname or '').rstrip('.')
+    if ':' in host:
+        # IPv6 literal
+        host = f"[{host}]"
+    netloc = host
+    # An invalid port raises rather than being dropped, which would make it a different URL
+    port = parts.port
+    if port and port != DEFAULT_PORTS.get(scheme):
+        netloc = f"{host}:{port}"
+    if parts.username:
+        credentials = parts.username + (f":{parts.password}" if parts.password else '')
+        netloc = f"{credentials}@{netloc}"
+
+    query = urlencode(sorted(
+        (name, value)
+        for name, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not _is_tracking_param(name)
+    ))
+
+    return urlunsplit((scheme, netloc, _normalize_path(parts.path), query, ''))
@@ -0,0 +1,63 @@
+"""Profile page detection from URL paths, shared by the crawler, exports and views.
+
+The patterns live in ProfilePattern rows: those for the job's host are
+tried first, then those for every site, each in order of `position`. A
+classifier compiles them into one case-insensitive alternation with a
+named group per pattern, so a single match finds the first pattern that
+applies and the group's name gives its type. Paths are matched with a
+trailing slash, so a listing root such as /speakers matches ^/speakers?/
+just as /speakers/ does.
+
+The crawler stores each endpoint's type on WebsiteEndpoint.profile_type;
+after the patterns change, `manage.py classify_endpoints` updates jobs
+already crawled.
+"""
+import re
+from urllib.parse import urlparse
+from ..models import ProfilePattern
+
+class UrlClassifier:
+    def __init__(self, patterns):
+        """`patterns` is a sequence of (regular expression, profile type), first match wins"""
+        self.patterns = list(patterns)
+        self._types = {f'p{i}': profile_type for i, (_, profile_type) in enumerate(self.patterns)}
+        alternation = '|'.join(f'(?P<p{i}>{pattern})' for i, (pattern, _) in enumerate(self.patterns))
+        # An empty alternation would match every path
+        self._regex = re.compile(alternation, re.IGNORECASE) if self.patterns else None
+
+    def classify_path(self, path):
+        """Profile type of a URL path, or None"""
+        if self._regex is None:
+            return None
+        match = self._regex.match(path if path.endswith('/') else path + '/')
+        # The pattern's own group closes last, so it is the last group matched
+        return self._types[match.lastgroup] if match else None
+
+    def is_profile(self, path):
+        return self.classify_path(path) is not None
+
+def site_host(url):
+    """The host a job's patterns are looked up by"""
+    return (urlparse(url).hostname or '').lower()
+
+def classifier_for(url):
+    """Classifier with the patterns for the site `url` is on"""
+    host = site_host(url)
+    patterns = ProfilePattern.objects.filter(site__in=['', host]).values_list('site', 'position', 'id', 'pattern', 'profile_type')
+    # Site-specific patterns take precedence
+    ordered = sorted(patterns, key=lambda row: (row[0] == '', row[1], row[2]))
+    return UrlClassifier([(pattern, profile_type) for _, _, _, pattern, profile_type in ordered])
+
+def classify_endpoints(endpoints, classifier, batch_size=1000):
+    """Store each endpoint's type from `classifier` and return how many changed"""
+    changed = {}
+    for endpoint_id, path, current in endpoints.values_list('id', 'path', 'profile_type').iterator(chunk_size=batch_size):
+        profile_type = classifier.classify_path(path) or ''
+        if profile_type != current:
+            changed.setdefault(profile_type, []).append(endpoint_id)
+
+    # One UPDATE per type and batch of ids
+    for profile_type, ids in changed.items():
+        for start in range(0, len(ids), batch_size):
+            endpoints.model.objects.filter(id__in=ids[start:start + batch_size]).update(profile_type=profile_type)
+    return sum(len(ids) for ids in changed.values())
@@ -0,0 +1,39 @@
+"""Crawl priorities that put profile pages, and the listings leading to them, first.
+
+A URL's score comes from its path (does the job's UrlClassifier call it a profile,
+or look like a listing's next page), its depth, and the page it was found
+on: a page linking to many profiles is a listing, so its other links are
+likely more listings and are worth following early. On incremental
+re-crawls, pages whose sitemap lastmod predates the previous crawl come last.
+"""
+import re
+
+PAGINATION = re.compile(r'[?&](?:page|p|pg|offset|start)=\d+|/page/\d+', re.IGNORECASE)
+
+PROFILE_SCORE = 100
+PAGINATION_SCORE = 40
+# Per profile link on the linking page, capped so one huge listing can't dominate
+LISTING_LINK_SCORE = 2
+LISTING_LINK_CAP = 25
+DEPTH_PENALTY = 5
+# Sitemap pages not modified since an incremental job's previous crawl go behind everything else
+UNCHANGED_PENALTY = 200
+
+def is_profile_path(path, classifier):
+    """A profile page or a listing such as /speakers"""
+    return classifier.is_profile(path)
+
+def url_priority(url, path, depth, classifier, profile_links=0):
+    """Score one URL found at `depth` on a page linking to `profile_links` profiles"""
+    if is_profile_path(path, classifier):
+        score = PROFILE_SCORE
+    else:
+        score = LISTING_LINK_SCORE * min(profile_links, LISTING_LINK_CAP)
+        if profile_links and PAGINATION.search(url):
+            score += PAGINATION_SCORE
+    return score - DEPTH_PENALTY * depth
+
+def link_priorities(endpoints, urls, depth, classifier):
+    """Priorities for `urls`, a subset of one page's endpoints, queued at `depth`"""
+    profile_links = sum(1 for fields in endpoints.values() if is_profile_path(fields['path'], classifier))
+    return {url: url_priority(url, endpoints[url]['path'], depth, classifier, profile_links) for url in urls}
@@ -0,0 +1,26 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, pre_delete
+from django.dispatch import receiver
+from .models import ScrapingJob
+from .services.blob_cleanup import delete_unreferenced
+from .services.export_cache import export_cache
+
+@receiver(pre_delete, sender=ScrapingJob)
+def remember_job_blobs(sender, instance, **kwargs):
+    # The job's pages are gone by post_delete
+    instance._blob_digests = set(
+        instance.contents.exclude(content_hash='').values_list('content_hash', flat=True).distinct()
+    )
+
+@receiver(post_delete, sender=ScrapingJob)
+def delete_job_blobs(sender, instance, **kwargs):
+    """Remove the blobs only the deleted job used, once the deletion is committed"""
+    digests = getattr(instance, '_blob_digests', None)
+    if digests:
+        transaction.on_commit(lambda: delete_unreferenced(digests))
+
+@receiver(post_delete, sender=ScrapingJob)
+def delete_job_exports(sender, instance, **kwargs):
+    """Drop the deleted job's cached exports, which would otherwise still be served"""
+    job_id = instance.id
+    transaction.on_commit(lambda: export_cache.invalidate(job_id))
@@ -0,0 +1,76 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from celery import shared_task
+from django.conf import settings
+from django.db import close_old_connections
+from .models import ScrapingJob
+from .services.export_cache import export_cache
+from .services.scraper_service import WebScraper
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+@shared_task
+def run_scraping_job(job_id, resume=False):
+    """Crawl a job to completion; a job that already started is resumed instead of restarted"""
+    job = ScrapingJob.objects.get(id=job_id)
+    scraper = WebScraper(job.id)
+    if resume or job.status == 'IN_PROGRESS':
+        scraper.resume_scraping()
+    else:
+        scraper.start_scraping()
+    enqueue_export_build(job.id)
+
+@shared_task
+def build_job_exports(job_id):
+    """Cache the SCRAPER_EXPORT_PREBUILD exports of a completed job, so downloads are served from disk"""
+    job = ScrapingJob.objects.get(id=job_id)
+    if job.status != 'COMPLETED':
+        return
+    for format_name, dataset_name in getattr(settings, 'SCRAPER_EXPORT_PREBUILD', []):
+        export_cache.build(job, format_name, dataset_name)
+
+def _build_in_thread(job_id):
+    try:
+        build_job_exports(job_id)
+    except Exception:
+        # Exports are still generated on download
+        logger.exception("Building exports of job %s failed", job_id)
+    finally:
+        close_old_connections()
+
+def _run_in_thread(job_id, resume):
+    try:
+        run_scraping_job(job_id, resume)
+    except Exception:
+        # The job is already marked FAILED with the error message
+        logger.exception("Scraping job %s failed", job_id)
+    finally:
+        close_old_connections()
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'SCRAPER_WORKER_THREADS', 2),
+                thread_name_prefix='scraping-job'
+            )
+        return _executor
+
+def enqueue_scraping_job(job_id, resume=False):
+    """Run a scraping job in the background with the configured SCRAPER_TASK_BACKEND"""
+    if getattr(settings, 'SCRAPER_TASK_BACKEND', 'thread') == 'celery':
+        run_scraping_job.delay(job_id, resume)
+    else:
+        _get_executor().submit(_run_in_thread, job_id, resume)
+
+def enqueue_export_build(job_id):
+    """Build a completed job's exports in the background with the configured SCRAPER_TASK_BACKEND"""
+    if getattr(settings, 'SCRAPER_TASK_BACKEND', 'thread') == 'celery':
+        build_job_exports.delay(job_id)
+    else:
+        _get_executor().submit(_build_in_thread, job_id)
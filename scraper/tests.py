@@ -1,3 +1,353 @@
-from django.test import TestCase
+import asyncio
+import csv
+import gzip
+import io
+import json
+import os
+import tempfile
+import time
+from datetime import timedelta
+from pathlib import Path
+from unittest import mock, skipIf
+from urllib.parse import urlparse
+import pandas as pd
+from django.conf import settings
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from .models import ScrapedContent, ScrapingJob, WebsiteEndpoint
+from .services import job_export
+from .services.archive import archive_job
+from .services.blob_cleanup import collect_garbage
+from .services.blob_store import BlobStore, blob_store
+from .services.circuit_breaker import CircuitBreaker
+from .services.export_cache import export_cache
+from .services.incremental import load_previous_pages
+from .services.job_export import bulk_export_stream, export_stream, select_jobs
+from .services.page_parser import endpoint_fields, parse_page
+from .services.scraper_service import WebScraper
+from .services.url_canonical import canonicalize_url
+from .services.url_classifier import UrlClassifier
 
-# Create your tests here.
+class BlobCleanupTests(TestCase):
+    def setUp(self):
+        self.store = BlobStore(tempfile.mkdtemp())
+        patcher = mock.patch('scraper.services.blob_cleanup.blob_store', self.store)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _page(self, job, body):
+        digest, size = self.store.put(body)
+        return ScrapedContent.objects.create(
+            job=job, url=f'https://example.com/{digest[:8]}', html_preview='', content_hash=digest,
+            content_size=size, html_file_path=''
+        )
+
+    def _age(self, digest, seconds):
+        old = time.time() - seconds
+        os.utime(self.store.path_for(digest), (old, old))
+
+    def test_deleting_a_job_removes_only_its_own_blobs(self):
+        job = ScrapingJob.objects.create(url='https://example.com/')
+        other = ScrapingJob.objects.create(url='https://example.com/')
+        own = self._page(job, b'only in the deleted job').content_hash
+        shared = self._page(job, b'in both jobs').content_hash
+        self._page(other, b'in both jobs')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            job.delete()
+
+        self.assertFalse(self.store.exists(own))
+        self.assertTrue(self.store.exists(shared))
+
+    def test_collect_garbage_skips_referenced_and_recent_blobs(self):
+        job = ScrapingJob.objects.create(url='https://example.com/')
+        used = self._page(job, b'still used').content_hash
+        orphan, _ = self.store.put(b'orphaned')
+        recent, _ = self.store.put(b'written by a running crawl')
+        self._age(used, 7200)
+        self._age(orphan, 7200)
+
+        self.assertEqual(collect_garbage(min_age=3600, dry_run=True)[0], 1)
+        self.assertTrue(self.store.exists(orphan))
+
+        removed, _ = collect_garbage(min_age=3600)
+        self.assertEqual(removed, 1)
+        self.assertFalse(self.store.exists(orphan))
+        self.assertTrue(self.store.exists(used))
+        self.assertTrue(self.store.exists(recent))
+
+class ArchiveJobTests(TestCase):
+    def test_warc_export_reads_bodies_from_the_blob_store(self):
+        store = BlobStore(tempfile.mkdtemp())
+        job = ScrapingJob.objects.create(url='https://example.com/')
+        for url, body in [('https://example.com/', b'<p>home</p>'), ('https://example.com/about', b'<p>about</p>')]:
+            digest, size = store.put(body)
+            ScrapedContent.objects.create(
+                job=job, url=url, html_preview='', content_hash=digest, content_size=size, encoding='utf-8'
+            )
+
+        path = Path(tempfile.mkdtemp()) / 'pages.warc.gz'
+        self.assertEqual(archive_job(job, path, store=store), 2)
+        records = gzip.decompress(path.read_bytes()).split(b'WARC/1.0\r\n')[1:]
+        self.assertEqual([record.split(b'\r\n')[0] for record in records], [
+            b'WARC-Type: warcinfo', b'WARC-Type: resource', b'WARC-Type: resource'
+        ])
+        self.assertIn(b'WARC-Target-URI: https://example.com/about', records[2])
+        self.assertIn(b'charset=utf-8', records[2])
+        self.assertIn(b'<p>about</p>', records[2])
+
+class CanonicalUrlTests(TestCase):
+    def test_escapes_keep_their_meaning(self):
+        # Latin-1 and reserved characters are different resources from their decoded forms
+        self.assertEqual(canonicalize_url('https://example.com/caf%E9'), 'https://example.com/caf%E9')
+        self.assertEqual(canonicalize_url('https://example.com/a%2Fb'), 'https://example.com/a%2Fb')
+        self.assertNotEqual(canonicalize_url('https://example.com/caf%E9'), canonicalize_url('https://example.com/caf%E8'))
+
+    def test_unreserved_escapes_are_decoded_and_hex_upper_cased(self):
+        self.assertEqual(canonicalize_url('https://example.com/%7euser/%41'), 'https://example.com/~user/A')
+        self.assertEqual(canonicalize_url('https://example.com/caf%c3%a9'), 'https://example.com/caf%C3%A9')
+        self.assertEqual(canonicalize_url('https://example.com/café'), 'https://example.com/caf%C3%A9')
+        self.assertEqual(canonicalize_url('https://example.com/100%'), 'https://example.com/100%25')
+
+    def test_dot_segments_resolve_and_trailing_slash_is_dropped(self):
+        self.assertEqual(canonicalize_url('https://example.com/a/./b/../speakers/'), 'https://example.com/a/speakers')
+        self.assertEqual(canonicalize_url('https://example.com/speakers'), 'https://example.com/speakers')
+        self.assertEqual(canonicalize_url('https://EXAMPLE.com:443'), 'https://example.com/')
+
+    def test_invalid_port_is_an_error(self):
+        with self.assertRaises(ValueError):
+            canonicalize_url('https://example.com:abc/')
+
+class ParsePageTests(TestCase):
+    def test_relative_links_resolve_against_the_fetched_url(self):
+        body = b'<html><body><a href="jane-doe/">Jane</a><a href="../about">About</a></body></html>'
+        # /speakers redirected to /speakers/, which the links are relative to
+        page = parse_page(body, 'https://example.com/speakers/', 'text/html; charset=utf-8', site_url='https://example.com/')
+        self.assertEqual(
+            set(page['endpoints']),
+            {'https://example.com/speakers/jane-doe', 'https://example.com/about'}
+        )
+
+    def test_malformed_links_are_skipped(self):
+        body = b'<a href="http://[::1">Broken</a><a href="https://example.com:abc/">Bad port</a><a href="/ok">OK</a>'
+        page = parse_page(body, 'https://example.com/', 'text/html')
+        self.assertEqual(set(page['endpoints']), {'https://example.com/ok'})
+
+    def test_internal_means_the_jobs_host_not_the_redirect_target(self):
+        body = b'<a href="/team">Team</a><a href="https://example.com/contact">Contact</a>'
+        page = parse_page(body, 'https://elsewhere.org/', 'text/html', site_url='https://example.com/')
+        self.assertEqual(page['endpoints'], {})
+
+class CircuitBreakerTests(TestCase):
+    def test_released_probe_lets_the_next_request_probe(self):
+        async def scenario():
+            breaker = CircuitBreaker(threshold=1, cooldown=0.01)
+            breaker.record_failure('example.com')
+            self.assertTrue(await breaker.wait('example.com'))
+            waiting = asyncio.create_task(breaker.wait('example.com'))
+            await asyncio.sleep(0.05)
+            self.assertFalse(waiting.done())
+            breaker.release('example.com')
+            return await asyncio.wait_for(waiting, 1)
+
+        self.assertTrue(asyncio.run(scenario()))
+
+class ThrottleTests(TestCase):
+    def test_a_host_still_throttling_after_every_retry_counts_as_failing(self):
+        job = ScrapingJob.objects.create(url='https://example.com/')
+        scraper = WebScraper(job.id)
+        url = 'https://example.com/busy'
+        scraper._throttle_retries[url] = scraper.THROTTLE_RETRIES
+        response = mock.Mock(status_code=429, headers={'Retry-After': '1'})
+        response.elapsed.total_seconds.return_value = 0.1
+
+        with mock.patch.object(scraper, '_fetch_with_retries', mock.AsyncMock(return_value=(response, None, 0))):
+            state = asyncio.run(scraper._fetch_and_store(url, 'example.com', 0))
+
+        self.assertEqual(state, 'FAILED')
+        self.assertEqual(scraper.breaker._circuit('example.com').failures, 1)
+
+@override_settings(
+    MEDIA_ROOT=tempfile.mkdtemp(),
+    SCRAPER_BLOB_ROOT=tempfile.mkdtemp(),
+    SCRAPER_RESPECT_ROBOTS=False,
+    SCRAPER_USE_SITEMAPS=False,
+    SCRAPER_FETCH_RETRIES=2,
+    SCRAPER_RETRY_BACKOFF=0,
+    SCRAPER_BREAKER_THRESHOLD=1,
+    SCRAPER_BREAKER_COOLDOWN=0.05,
+    SCRAPER_BREAKER_MAX_TRIPS=3,
+    SCRAPER_MAX_ATTEMPTS=10,
+)
+class DeadHostTests(TransactionTestCase):
+    def test_crawl_of_a_dead_host_fails_instead_of_hanging(self):
+        # Nothing listens on the discard port, so every connection is refused
+        job = ScrapingJob.objects.create(url='http://127.0.0.1:9/', host_rate=100, max_host_rate=100)
+        started = time.monotonic()
+        with self.assertRaisesMessage(Exception, 'still failing'):
+            WebScraper(job.id).start_scraping()
+        self.assertLess(time.monotonic() - started, 20)
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'FAILED')
+
+@override_settings(SCRAPER_EXPORT_CACHE_ROOT=tempfile.mkdtemp())
+class ExportCacheTests(TestCase):
+    def test_deleting_a_job_drops_its_cached_exports(self):
+        job = ScrapingJob.objects.create(url='https://example.com/', status='COMPLETED')
+        export_cache.build(job, 'csv', 'endpoints')
+        artifact = export_cache.artifact('csv', 'endpoints')
+        self.assertTrue(str(export_cache.lookup(job.id, artifact)).startswith(settings.SCRAPER_EXPORT_CACHE_ROOT))
+
+        job_id = job.id
+        with self.captureOnCommitCallbacks(execute=True):
+            job.delete()
+        self.assertIsNone(export_cache.lookup(job_id, artifact))
+
+class JobExportTests(TestCase):
+    def setUp(self):
+        self.job = ScrapingJob.objects.create(url='https://example.com/')
+        for path in ('/a', '/b'):
+            WebsiteEndpoint.objects.create(
+                job=self.job, url=f'https://example.com{path}', endpoint_name=path.strip('/'), path=path
+            )
+
+    def _export(self, format_name, job=None):
+        chunks, _, _ = export_stream(job or self.job, 'endpoints', format_name)
+        return b''.join(chunks)
+
+    def test_csv_round_trips_through_gzip(self):
+        rows = list(csv.reader(io.StringIO(gzip.decompress(self._export('csv')).decode('utf-8'))))
+        self.assertEqual(rows[0], ['endpoint_name', 'url', 'path', 'discovered_at'])
+        self.assertEqual([row[1] for row in rows[1:]], ['https://example.com/a', 'https://example.com/b'])
+
+    def test_csv_of_an_empty_dataset_still_has_its_header(self):
+        empty = ScrapingJob.objects.create(url='https://example.org/')
+        text = gzip.decompress(self._export('csv', empty)).decode('utf-8')
+        self.assertEqual(text.strip(), 'endpoint_name,url,path,discovered_at')
+
+    def test_jsonl_has_one_object_per_row(self):
+        lines = gzip.decompress(self._export('jsonl')).decode('utf-8').splitlines()
+        records = [json.loads(line) for line in lines]
+        self.assertEqual([record['path'] for record in records], ['/a', '/b'])
+        self.assertEqual(set(records[0]), {'endpoint_name', 'url', 'path', 'discovered_at'})
+
+    @skipIf(job_export.pyarrow is None, 'pyarrow is not installed')
+    def test_parquet_keeps_rows_and_types(self):
+        frame = pd.read_parquet(io.BytesIO(self._export('parquet')))
+        self.assertEqual(list(frame['url']), ['https://example.com/a', 'https://example.com/b'])
+        self.assertEqual(str(frame['discovered_at'].dtype), 'datetime64[ns, UTC]')
+
+class BulkExportTests(TestCase):
+    def test_endpoints_found_by_several_jobs_are_merged_by_url(self):
+        jobs = [ScrapingJob.objects.create(url='https://example.com/') for _ in range(2)]
+        for job, paths in zip(jobs, [('/speakers/jane', '/about'), ('/speakers/jane', '/contact')]):
+            for path in paths:
+                WebsiteEndpoint.objects.create(
+                    job=job, url=f'https://example.com{path}', endpoint_name=path, path=path,
+                    profile_type='speakers?' if path.startswith('/speakers/') else ''
+                )
+        other = ScrapingJob.objects.create(url='https://example.com/')
+        WebsiteEndpoint.objects.create(job=other, url='https://example.com/other', endpoint_name='other', path='/other')
+
+        chunks, extension, _ = bulk_export_stream(select_jobs(job_ids=[job.id for job in jobs]), 'endpoints', 'csv')
+        rows = list(csv.DictReader(io.StringIO(gzip.decompress(b''.join(chunks)).decode('utf-8'))))
+
+        self.assertEqual(extension, 'csv.gz')
+        self.assertEqual([row['url'] for row in rows], [
+            'https://example.com/about', 'https://example.com/contact', 'https://example.com/speakers/jane'
+        ])
+        jane = rows[2]
+        self.assertEqual((jane['jobs'], jane['last_job_id'], jane['type']), ('2', str(jobs[1].id), 'speakers?'))
+
+@override_settings(SCRAPER_BLOB_ROOT=tempfile.mkdtemp())
+class NearDuplicateTests(TestCase):
+    def _page(self, *paths):
+        urls = [f'https://example.com{path}' for path in paths]
+        return {
+            'encoding': 'utf-8', 'title': 'Speakers', 'simhash': 12345,
+            'endpoints': {url: endpoint_fields(urlparse(url)) for url in urls},
+        }
+
+    def test_a_near_duplicate_listing_page_still_queues_its_new_links(self):
+        job = ScrapingJob.objects.create(url='https://example.com/')
+        scraper = WebScraper(job.id)
+        scraper._store_page('https://example.com/speakers?page=1', b'<p>1</p>', self._page('/speakers/jane'), 0, {})
+        scraper._store_page('https://example.com/speakers?page=2', b'<p>2</p>', self._page('/speakers/bob'), 0, {})
+        scraper.endpoints.flush()
+
+        self.assertEqual(scraper.job.pages_duplicate, 1)
+        queued = set(job.frontier.values_list('url', flat=True))
+        self.assertEqual(queued, {'https://example.com/speakers/jane', 'https://example.com/speakers/bob'})
+        self.assertTrue(job.endpoints.filter(url='https://example.com/speakers/bob').exists())
+        second = job.contents.get(url='https://example.com/speakers?page=2')
+        self.assertEqual(second.duplicate_of, job.contents.get(url='https://example.com/speakers?page=1'))
+
+class ResumeClaimTests(TestCase):
+    def test_a_stale_job_is_claimed_once(self):
+        stale = timezone.now() - timedelta(hours=1)
+        job = ScrapingJob.objects.create(url='https://example.com/', status='IN_PROGRESS', last_checkpoint_at=stale)
+        first, second = ScrapingJob.objects.get(id=job.id), ScrapingJob.objects.get(id=job.id)
+        self.assertTrue(first.claim_for_resume())
+        self.assertFalse(second.claim_for_resume())
+
+    def test_a_heartbeat_after_the_read_wins_over_the_claim(self):
+        stale = timezone.now() - timedelta(hours=1)
+        job = ScrapingJob.objects.create(url='https://example.com/', status='IN_PROGRESS', last_checkpoint_at=stale)
+        ScrapingJob.objects.filter(id=job.id).update(last_checkpoint_at=timezone.now())
+        self.assertFalse(job.claim_for_resume())
+        self.assertEqual(ScrapingJob.objects.get(id=job.id).status, 'IN_PROGRESS')
+
+@override_settings(SCRAPER_BLOB_ROOT=tempfile.mkdtemp())
+class IncrementalChangeTests(TestCase):
+    def test_pages_are_counted_as_added_changed_or_unchanged(self):
+        previous = ScrapingJob.objects.create(url='https://example.com/', status='COMPLETED')
+        for path, body in [('/same', b'same body'), ('/edited', b'old body')]:
+            digest, size = blob_store.put(body)
+            ScrapedContent.objects.create(
+                job=previous, url=f'https://example.com{path}', html_preview='', content_hash=digest, content_size=size
+            )
+        job = ScrapingJob.objects.create(url='https://example.com/', previous_job=previous)
+        scraper = WebScraper(job.id)
+        scraper.previous = load_previous_pages(previous)
+
+        for path, body in [('/same', b'same body'), ('/edited', b'new body'), ('/fresh', b'fresh body')]:
+            url = f'https://example.com{path}'
+            scraper._store_page(url, body, parse_page(body, url, 'text/html'), 0, {})
+
+        self.assertEqual(
+            (scraper.job.pages_added, scraper.job.pages_changed, scraper.job.pages_unchanged), (1, 1, 1)
+        )
+        self.assertEqual(dict(job.contents.values_list('url', 'change')), {
+            'https://example.com/same': 'UNCHANGED',
+            'https://example.com/edited': 'CHANGED',
+            'https://example.com/fresh': 'ADDED',
+        })
+        unchanged = job.contents.get(url='https://example.com/same')
+        self.assertEqual(unchanged.content_hash, blob_store.digest(b'same body'))
+
+class SitemapSeedTests(TestCase):
+    def test_pages_unchanged_since_the_previous_crawl_are_queued_last(self):
+        crawled = timezone.now() - timedelta(days=1)
+        previous = ScrapingJob.objects.create(url='https://example.com/', status='COMPLETED')
+        for path in ('old', 'new'):
+            ScrapedContent.objects.create(job=previous, url=f'https://example.com/{path}', html_preview='', scraped_at=crawled)
+        job = ScrapingJob.objects.create(url='https://example.com/', previous_job=previous)
+        scraper = WebScraper(job.id)
+        scraper.previous = load_previous_pages(previous)
+
+        urls = ['https://example.com/old', 'https://example.com/new', 'https://example.com/added']
+        scraper._seed({url: endpoint_fields(urlparse(url)) for url in urls}, {
+            'https://example.com/old': crawled - timedelta(days=7),
+            'https://example.com/new': timezone.now(),
+        })
+        order = [entry[1] for entry in scraper.frontier.claim(3)]
+        self.assertEqual(order[-1], 'https://example.com/old')
+
+class UrlClassifierTests(TestCase):
+    def test_listing_roots_match_without_a_trailing_slash(self):
+        classifier = UrlClassifier([(r'^/speaker-profile/', 'speaker-profile'), (r'^/speakers?/', 'speakers?')])
+        self.assertEqual(classifier.classify_path('/speakers'), 'speakers?')
+        self.assertEqual(classifier.classify_path('/Speakers/jane-doe/'), 'speakers?')
+        self.assertEqual(classifier.classify_path('/speaker-profile/x'), 'speaker-profile')
+        self.assertIsNone(classifier.classify_path('/speakership'))
+        self.assertIsNone(UrlClassifier([]).classify_path('/speakers'))
@@ -1,10 +1,15 @@
 from django.urls import path, include
-from .views import HomeView, JobDetailView, export_job_data
+from .views import HomeView, JobDetailView, download_content, resume_scraping, job_status, job_performance, export_job_data, bulk_export
 
 app_name = 'scraper'
 
 urlpatterns = [
     path('', HomeView.as_view(), name='home'),
     path('job/<int:job_id>/', JobDetailView.as_view(), name='job_detail'),
+    path('job/<int:job_id>/content/<int:content_id>/', download_content, name='download_content'),
+    path('job/<int:job_id>/status/', job_status, name='job_status'),
+    path('job/<int:job_id>/performance/', job_performance, name='job_performance'),
+    path('job/<int:job_id>/resume/', resume_scraping, name='resume_scraping'),
     path('job/<int:job_id>/export/', export_job_data, name='export_job_data'),
+    path('export/', bulk_export, name='bulk_export'),
 ]
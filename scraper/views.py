@@ -1,10 +1,17 @@
-from django.shortcuts import render, redirect
+from django.shortcuts import render, redirect, get_object_or_404
 from django.views.generic import TemplateView, ListView
 from django.contrib import messages
-from django.http import HttpResponse
+from django.db.models import Count
+from django.utils.dateparse import parse_date
+from django.http import FileResponse, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_POST
 from .models import ScrapingJob, ScrapedContent
-from .services.scraper_service import WebScraper
+from .tasks import enqueue_scraping_job
 from .services.excel_exporter import ExcelExporter
+from .services.incremental import find_previous_job
+from .services.export_cache import export_cache
+from .services.job_export import FORMATS, bulk_export_stream, export_filename, export_stream, pyarrow, select_jobs
+from .services.telemetry import performance_summary
 
 class HomeView(TemplateView):
     template_name = 'scraper/index.html'
@@ -12,25 +19,49 @@ class HomeView(TemplateView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['recent_jobs'] = ScrapingJob.objects.order_by('-created_at')[:10]
+        context['parquet_available'] = pyarrow is not None
         return context
 
     def post(self, request, *args, **kwargs):
         url = request.POST.get('url')
         if url:
             try:
+                # Optional budgets; the crawl stops early once any is used up
+                max_pages = self._optional_int('max_pages')
+                max_megabytes = self._optional_int('max_megabytes')
+                max_minutes = self._optional_int('max_minutes')
+
+                # Incremental jobs only fetch and store what changed since the last crawl
+                previous_job = find_previous_job(url) if request.POST.get('incremental') else None
+                if request.POST.get('incremental') and previous_job is None:
+                    messages.info(request, 'No completed crawl of this site yet; running a full crawl.')
+
                 # Create a new scraping job
-                job = ScrapingJob.objects.create(url=url)
+                job = ScrapingJob.objects.create(
+                    url=url,
+                    previous_job=previous_job,
+                    max_pages=max_pages,
+                    max_bytes=max_megabytes * 1024 * 1024 if max_megabytes else None,
+                    max_duration=max_minutes * 60 if max_minutes else None
+                )
                 
-                # Start the scraping process
-                scraper = WebScraper(job.id)
-                scraper.start_scraping()
+                # Crawl in the background; the job page polls for progress
+                enqueue_scraping_job(job.id)
                 
-                messages.success(request, 'Scraping job started successfully!')
+                messages.success(request, 'Scraping job queued successfully!')
                 return redirect('scraper:job_detail', job_id=job.id)
             except Exception as e:
                 messages.error(request, f'Error: {str(e)}')
         return self.render_to_response(self.get_context_data())
 
+    def _optional_int(self, name):
+        value = self.request.POST.get(name, '').strip()
+        if not value:
+            return None
+        if not value.isdigit() or int(value) == 0:
+            raise ValueError(f'{name.replace("_", " ").capitalize()} must be a positive whole number')
+        return int(value)
+
 class JobDetailView(ListView):
     template_name = 'scraper/results.html'
     context_object_name = 'scraped_contents'
@@ -43,19 +74,138 @@ class JobDetailView(ListView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['job'] = self.job
+        context['parquet_available'] = pyarrow is not None
+        context['export_datasets'] = [
+            ('endpoints', 'Endpoints'), ('profile-endpoints', 'Profile endpoints'), ('contents', 'Scraped contents')
+        ]
+        # Endpoints are classified as they are found, so these are indexed lookups
+        context['profile_types'] = (
+            self.job.endpoints.filter(profile_type__gt='')
+            .values('profile_type').annotate(total=Count('id')).order_by('-total')
+        )
+        endpoint_type = self.request.GET.get('endpoint_type', '')
+        endpoints = self.job.endpoints.all()
+        if endpoint_type == 'profile':
+            endpoints = endpoints.filter(profile_type__gt='')
+        elif endpoint_type:
+            endpoints = endpoints.filter(profile_type=endpoint_type)
+        context['endpoints'] = endpoints
+        context['endpoint_type'] = endpoint_type
+        if self.job.telemetry:
+            context['performance'] = performance_summary(self.job.telemetry, self.job.pages_scraped)
         return context
 
+def download_content(request, job_id, content_id):
+    content = get_object_or_404(ScrapedContent, id=content_id, job_id=job_id)
+    response = HttpResponse(content.html_content, content_type='text/html; charset=utf-8')
+    response['Content-Disposition'] = f'attachment; filename=content_{content.id}.html'
+    return response
+
+@require_POST
+def resume_scraping(request, job_id):
+    job = ScrapingJob.objects.get(id=job_id)
+    # Back to pending so the job can't be resumed twice while it waits for a worker
+    if not job.claim_for_resume():
+        messages.error(request, 'This job is not interrupted and cannot be resumed.')
+        return redirect('scraper:job_detail', job_id=job_id)
+
+    enqueue_scraping_job(job.id, resume=True)
+    messages.success(request, 'Scraping job queued to resume!')
+    return redirect('scraper:job_detail', job_id=job_id)
+
+def job_status(request, job_id):
+    """Live progress counters for a job, cheap enough to poll"""
+    progress = ScrapingJob.objects.filter(id=job_id).values('id', *ScrapingJob.PROGRESS_FIELDS).first()
+    if progress is None:
+        return JsonResponse({'error': 'Job not found'}, status=404)
+    return JsonResponse(progress)
+
+def job_performance(request, job_id):
+    """Where the job's crawl time went: phase latencies, status codes and per-host statistics"""
+    job = ScrapingJob.objects.filter(id=job_id).values('pages_scraped', 'telemetry').first()
+    if job is None:
+        return JsonResponse({'error': 'Job not found'}, status=404)
+    return JsonResponse(performance_summary(job['telemetry'], job['pages_scraped']))
+
+XLSX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
 def export_job_data(request, job_id):
+    """Download a job's data: an xlsx workbook by default, or one dataset in another format.
+
+    Exports of completed jobs are cached on disk; a cached copy is sent
+    without touching the database.
+    """
+    export_format = request.GET.get('format', 'xlsx')
+    dataset = request.GET.get('dataset', 'endpoints')
     try:
-        exporter = ExcelExporter(job_id)
-        excel_file = exporter.export()
-        
-        response = HttpResponse(
-            excel_file.read(),
-            content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-        )
-        response['Content-Disposition'] = f'attachment; filename=scraping_job_{job_id}.xlsx'
+        artifact = export_cache.artifact(export_format, dataset)
+    except ValueError as e:
+        messages.error(request, f'Error exporting data: {str(e)}')
+        return redirect('scraper:job_detail', job_id=job_id)
+
+    if export_format == 'xlsx':
+        filename, content_type = f'scraping_job_{job_id}.xlsx', XLSX_CONTENT_TYPE
+    else:
+        filename, content_type = export_filename(job_id, dataset, export_format), FORMATS[export_format].content_type
+
+    cached = export_cache.lookup(job_id, artifact)
+    if cached is not None:
+        try:
+            return FileResponse(open(cached, 'rb'), as_attachment=True, filename=filename, content_type=content_type)
+        except FileNotFoundError:
+            # Evicted or invalidated since the lookup
+            pass
+
+    job = get_object_or_404(ScrapingJob, id=job_id)
+    if export_format != 'xlsx':
+        chunks, _, _ = export_stream(job, dataset, export_format)
+        if job.status == 'COMPLETED':
+            chunks = export_cache.store_stream(job, artifact, chunks)
+        response = StreamingHttpResponse(chunks, content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename={filename}'
         return response
+
+    try:
+        cached = export_cache.build_workbook(job) if job.status == 'COMPLETED' else None
+        if cached is not None:
+            excel_file = open(cached, 'rb')
+        else:
+            # Streamed from a temporary file in chunks, which is deleted once sent
+            excel_file = ExcelExporter(job_id).export()
+        return FileResponse(excel_file, as_attachment=True, filename=filename, content_type=content_type)
     except Exception as e:
         messages.error(request, f'Error exporting data: {str(e)}')
-        return redirect('scraper:job_detail', job_id=job_id)
\ No newline at end of file
+        return redirect('scraper:job_detail', job_id=job_id)
+
+def _optional_date(request, name):
+    value = request.GET.get(name, '').strip()
+    if not value:
+        return None
+    date = parse_date(value)
+    if date is None:
+        raise ValueError(f'{name.capitalize()} must be a date such as 2025-01-31')
+    return date
+
+def bulk_export(request):
+    """One deduplicated download of the endpoints of several jobs: ?jobs=1,2,3 and/or ?since=&until= dates"""
+    try:
+        job_ids = [job_id.strip() for job_id in request.GET.get('jobs', '').split(',') if job_id.strip()]
+        if not all(job_id.isdigit() for job_id in job_ids):
+            raise ValueError('Jobs must be a comma-separated list of job ids')
+        since = _optional_date(request, 'since')
+        until = _optional_date(request, 'until')
+        if not (job_ids or since or until):
+            raise ValueError('Choose jobs or a date range to export')
+        dataset = request.GET.get('dataset', 'profile-endpoints')
+        chunks, extension, content_type = bulk_export_stream(
+            select_jobs(job_ids, since, until, request.GET.get('status')),
+            dataset,
+            request.GET.get('format', 'csv')
+        )
+    except ValueError as e:
+        messages.error(request, f'Error exporting data: {str(e)}')
+        return redirect('scraper:home')
+
+    response = StreamingHttpResponse(chunks, content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename=scraping_jobs_{dataset}.{extension}'
+    return response